@@ -1,28 +1,64 @@
+import Ledger
+
+
+# Example bet spread: one unit up to a true count of 1, then one more
+# unit per point of true count, capped at 8 units
+def spread_1_to_8(bet_size, true_count):
+    return bet_size * min(max(int(true_count), 1), 8)
+
+
 class Bankroll():
-    
-    def __init__(self, curr_bet=0, player_bank=0, dealer_bank=0):
+
+    __slots__ = ("curr_bet", "player_bank", "dealer_bank", "interactive", "ledger", "session",
+                 "bet_spread")
+
+    # With interactive=False nothing is printed or prompted for and bad
+    # amounts raise ValueError; every change is recorded in 'ledger' if given.
+    # 'bet_spread(bet_size, true_count)' scales bets placed with a true count.
+    def __init__(self, curr_bet=0, player_bank=0, dealer_bank=0,
+                 interactive=True, ledger=None, session=0, bet_spread=None):
         self.curr_bet = curr_bet
         self.player_bank = player_bank
         self.dealer_bank = dealer_bank
-        
+        self.interactive = interactive
+        self.ledger = ledger
+        self.session = session
+        self.bet_spread = bet_spread
+
+    # Internal module
+    def record(self, kind, amount):
+        if self.ledger is not None:
+            self.ledger.record(self.session, kind, amount, self.player_bank)
+        if self.interactive:
+            print(f"New bankroll is {self.player_bank}")
+
     def deposit(self,dep_amt):
+        if dep_amt <= 0 and not self.interactive:
+            raise ValueError(f"Deposit of {dep_amt} must be positive")
         self.player_bank += dep_amt
-        print(f"New bankroll is {self.player_bank}")
-        
-    
+        self.record(Ledger.DEPOSIT, dep_amt)
+
+
     def withdraw(self,draw_amt):
-        while draw_amt >= self.player_bank:
+        if not 0 < draw_amt < self.player_bank and not self.interactive:
+            raise ValueError(f"Withdrawal of {draw_amt} must be above 0 and under {self.player_bank}")
+        while not 0 < draw_amt < self.player_bank:
             while True:
                 try:
-                    draw_amt = int(input(f"Please enter a withdrawal amount under {self.player_bank}: "))
+                    draw_amt = int(input(f"Please enter a withdrawal amount above 0 and under {self.player_bank}: "))
                 except:
-                    print("Whoops! That is not a number")                    
+                    print("Whoops! That is not a number")
                 else:
                     break
         self.player_bank -= draw_amt
-        print(f"New bankroll is {self.player_bank}")
-    
-    def bet(self,bet_size):
+        self.record(Ledger.WITHDRAW, draw_amt)
+
+    # Pass deck.true_count() as 'true_count' to apply the bet spread
+    def bet(self,bet_size,true_count=None):
+        if self.bet_spread is not None and true_count is not None:
+            bet_size = min(self.bet_spread(bet_size, true_count), self.player_bank)
+        if not 0 < bet_size <= self.player_bank and not self.interactive:
+            raise ValueError(f"Bet of {bet_size} must be above 0 and at most {self.player_bank}")
         while bet_size > self.player_bank:
             while True:
                 try:
@@ -32,15 +68,29 @@ class Bankroll():
                     continue
                 else:
                     break
-        
+
         self.curr_bet = bet_size
-    
+        if self.ledger is not None:
+            self.ledger.record(self.session, Ledger.BET, bet_size, self.player_bank)
+
     def player_win(self):
-        self.player_bank += bet_size
-        self.dealer_bank -= bet_size
-        print(f"New bankroll is {self.player_bank}")
-    
+        self.player_bank += self.curr_bet
+        self.dealer_bank -= self.curr_bet
+        self.record(Ledger.WIN, self.curr_bet)
+
     def dealer_win(self):
         self.player_bank -= self.curr_bet
         self.dealer_bank += self.curr_bet
-        print(f"New bankroll is {self.player_bank}")
\ No newline at end of file
+        self.record(Ledger.LOSS, self.curr_bet)
+
+    def push(self):
+        self.record(Ledger.PUSH, self.curr_bet)
+
+    # Settles the current bet from a Deck.result() value
+    def settle(self, result):
+        if result == 1:
+            self.player_win()
+        elif result == 0:
+            self.push()
+        else:
+            self.dealer_win()
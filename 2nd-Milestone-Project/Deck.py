@@ -1,97 +1,206 @@
 # Consider maybe doing a Deck class with these
 # Things like Deck.shuffle, Deck.draw
 
-from random import randint
+from array import array
+from random import shuffle
+
+# Cards are stored as numbers 0-51: rank is num % 13 (2 up to A) and
+# suit is num // 13. These tables are shared by every Deck so a card
+# costs one byte in a shoe or hand.
+SUITS = ("c", "d", "h", "s")
+FACES = {9:"J", 10:"Q", 11:"K", 12:"A"}
+
+CARD_LABEL = tuple(((num % 13) + 2, FACES.get(num % 13, (num % 13) + 2), SUITS[num // 13])
+                   for num in range(52))
+CARD_VALUE_A11 = tuple(11 if num % 13 == 12 else min((num % 13) + 2, 10) for num in range(52))
+CARD_VALUE_A1 = tuple(1 if num % 13 == 12 else min((num % 13) + 2, 10) for num in range(52))
+
+
+# Card counting systems: the tag added to the running count for each card
+# value, from aces (index 0) up to tens (index 9). KO is unbalanced (a full
+# deck counts +4, not 0): see Deck.true_count().
+COUNT_SYSTEMS = {
+    "hi-lo":    (-1, 1, 1, 1, 1, 1, 0, 0, 0, -1),
+    "ko":       (-1, 1, 1, 1, 1, 1, 1, 0, 0, -1),
+    "hi-opt-i": (0, 0, 1, 1, 1, 1, 0, 0, 0, -1),
+    "omega-ii": (0, 1, 1, 2, 2, 2, 1, 0, -1, -2),
+}
+
+
+# Converts a hand of card numbers to printable (value, label, suit) tuples
+def show_hand(hand):
+    return [CARD_LABEL[num] for num in hand]
+
 
 class Deck():
 
-    def __init__(self,dealt=[],player_hand=[],dealer_hand=[],
-                 last_card=(),turn='',
-                 player_count_A11=0, player_count_A1=0,dealer_count_A11=0,dealer_count_A1=0):
+    __slots__ = ("player_hand", "dealer_hand", "last_card", "turn",
+                 "player_count_A11", "player_count_A1", "dealer_count_A11", "dealer_count_A1",
+                 "decks", "penetration", "shoe", "cursor", "cut", "rng",
+                 "remaining", "count_tags", "balanced", "initial_count", "running_count")
+
+    # 'rng' is a random.Random to shuffle with instead of the global one.
+    # 'count_system' is a COUNT_SYSTEMS name or a tuple of 10 tags.
+    def __init__(self, decks=1, penetration=0.75, rng=None, count_system="hi-lo"):
         
-        self.dealt = dealt
-        self.player_hand = player_hand
-        self.dealer_hand = dealer_hand
-        self.last_card = last_card
-        self.turn = turn
-        self.player_count_A11 = player_count_A11
-        self.player_count_A1 = player_count_A1
-        self.dealer_count_A11 = dealer_count_A11
-        self.dealer_count_A1 = dealer_count_A1                
+        if decks < 1:
+            raise ValueError("A shoe needs at least one deck")
+        if not 0 < penetration <= 1:
+            raise ValueError("Penetration must be above 0 and at most 1")
+
+        self.player_hand = array('B')
+        self.dealer_hand = array('B')
+        self.last_card = -1
+        self.turn = ''
+        self.player_count_A11 = 0
+        self.player_count_A1 = 0
+        self.dealer_count_A11 = 0
+        self.dealer_count_A1 = 0
+
+        # Shoe of 'decks' x 52 card numbers, dealt in order from 'cursor'
+        # and reshuffled once 'cursor' passes the cut card at 'cut'
+        self.decks = decks
+        self.penetration = penetration
+        self.shoe = array('B', range(52)) * decks
+        self.cursor = len(self.shoe)
+        self.cut = int(len(self.shoe) * penetration)
+        self.rng = rng
+
+        # Cards left in the shoe by value (aces first, tens last) and the
+        # running count, both kept up to date by draw_card()
+        self.remaining = array('H', [0] * 10)
+        self.count_tags = COUNT_SYSTEMS[count_system] if isinstance(count_system, str) else tuple(count_system)
+        if len(self.count_tags) != 10:
+            raise ValueError("A count system needs one tag per card value, aces to tens")
+        # An unbalanced system starts each shoe at minus its count for all
+        # but one deck (4 - 4 x decks for KO), so it ends the shoe at its
+        # one-deck total
+        imbalance = 4 * sum(self.count_tags[:9]) + 16 * self.count_tags[9]
+        self.balanced = imbalance == 0
+        self.initial_count = -imbalance * (decks - 1)
+        self.running_count = self.initial_count
+
+    # Cards dealt since the last reshuffle
+    @property
+    def dealt(self):
+        return self.shoe[:self.cursor]
     
     def shuffle(self):
-        self.dealt = []
-        self.player_hand = []
-        self.dealer_hand = []
-        self.last_card = ()
+        self.reshuffle()
+        self.new_hand()
+
+    # Clears the hands for the next round, keeping the shoe unless
+    # the cut card has come out
+    def new_hand(self):
+        del self.player_hand[:]
+        del self.dealer_hand[:]
+        self.last_card = -1
+        self.turn = ''
         self.player_count_A11 = 0
         self.player_count_A1 = 0
         self.dealer_count_A11 = 0
         self.dealer_count_A1 = 0
-    
- 
-    # Internal module    
-    def assign_card(self,num):
-        suit = {0:"c",1:"d",2:"h",3:"s"}
-        face = {9:"J",10:"Q",11:"K",12:"A"}
-        deck = []
+        if self.cursor >= self.cut:
+            self.reshuffle()
 
-        if num % 13 < 9:
-            card_num = (num % 13) + 2
+    # Internal module: cards in 'in_play' (still in someone's hand) are kept
+    # out of the new shoe, set at its front as already dealt
+    def reshuffle(self, in_play=()):
+        if in_play:
+            left = [self.decks] * 52
+            for card in in_play:
+                left[card] -= 1
+            rest = array('B', (card for card in range(52) for copy in range(left[card])))
+        else:
+            rest = self.shoe
+        if self.rng is None:
+            shuffle(rest)
         else:
-            card_num = face[num % 13]
+            self.rng.shuffle(rest)
+        if in_play:
+            self.shoe = array('B', in_play) + rest
+        self.cursor = len(in_play)
+        # The cards in play are already seen, so they are neither remaining
+        # nor left out of the running count
+        self.remaining = array('H', [4 * self.decks] * 9 + [16 * self.decks])
+        self.running_count = self.initial_count
+        for card in in_play:
+            value = CARD_VALUE_A1[card] - 1
+            self.remaining[value] -= 1
+            self.running_count += self.count_tags[value]
 
-        self.last_card = ((num % 13) + 2, card_num, suit[num // 13])
+    # Remaining shoe as a (aces, 2s, ..., 9s, tens) tuple, see dealer_odds
+    def composition(self):
+        return tuple(self.remaining)
+
+    # Running count divided by the decks left in the shoe. Unbalanced
+    # systems such as KO are bet on the running count itself, with no
+    # true-count conversion, so it is returned unchanged for them.
+    def true_count(self):
+        if not self.balanced:
+            return self.running_count
+        decks_left = (len(self.shoe) - self.cursor) / 52
+        return self.running_count / max(decks_left, 0.5)
+    
+
+    # Deals two cards each, alternating player and dealer
+    def deal(self):
+        for i in range(4):
+            if self.turn == 'Player':
+                self.turn = 'Dealer'
+            else:
+                self.turn = 'Player'
+
+            self.draw_card()
+            self.tally()
 
 
     # Internal module
     def draw_card(self):     
-        i = randint(0,51)
+        # Only reached mid-hand with deep penetration: the cards in both
+        # hands stay out of the reshuffled shoe so none is dealt twice
+        if self.cursor >= len(self.shoe):
+            self.reshuffle(self.player_hand + self.dealer_hand)
 
-        while i not in self.dealt and len(self.dealt)<52:
-            self.dealt.append(i)
-            self.assign_card(i)
-            # To alternate turns
-            if self.turn == 'Player':
-                self.player_hand.append(self.last_card)
-            elif self.turn== 'Dealer':
-                self.dealer_hand.append(self.last_card)
+        self.last_card = self.shoe[self.cursor]
+        self.cursor += 1
+        value = CARD_VALUE_A1[self.last_card] - 1
+        self.remaining[value] -= 1
+        self.running_count += self.count_tags[value]
+        # To alternate turns
+        if self.turn == 'Player':
+            self.player_hand.append(self.last_card)
+        elif self.turn== 'Dealer':
+            self.dealer_hand.append(self.last_card)
+
+        return self.last_card
         
 
     # Internal module    
     def tally(self):
-        if self.last_card[1] == 'A':
-            local_score_A11 = 11
-            local_score_A1 = 1
-        elif self.last_card[0] > 10:
-            local_score_A11 = 10
-            local_score_A1 = 10
-        else:
-            local_score_A11 = self.last_card[0]
-            local_score_A1 = self.last_card[0]
+        local_score_A11 = CARD_VALUE_A11[self.last_card]
+        local_score_A1 = CARD_VALUE_A1[self.last_card]
                         
         if self.turn == 'Player':
             self.player_count_A11 += local_score_A11
             self.player_count_A1 += local_score_A1
-            local_total_A11 = self.player_count_A11
-            local_total_A1 = self.player_count_A1
-            #print(f"Ace-02 count : {self.player_count_A1} \nAce-10 count is {self.player_count_A11}")
         elif self.turn == 'Dealer':
             self.dealer_count_A11 += local_score_A11
             self.dealer_count_A1 += local_score_A1
-            local_total_A11 = self.dealer_count_A11
-            local_total_A1 = self.dealer_count_A1
-            #print(f"Ace-02 count : {self.dealer_count_A1} \nAce-10 count is {self.dealer_count_A11}")
         
     
+    # hit_stand is 'H'/'S' or a strategy callable such as a StrategyTable
     def player_play(self,hit_stand):
         self.turn = 'Player'
+        if callable(hit_stand):
+            hit_stand = hit_stand(self)
         if hit_stand == 'H':
             self.draw_card()
             self.tally()
         else:
             # End turn
             pass
+        return hit_stand
         
     def dealer_play(self,hit_stand):
         self.turn = 'Dealer'
@@ -103,6 +212,40 @@ class Deck():
             pass     
         
     
+    # Player may keep hitting until they bust or reach 21
+    def player_can_hit(self):
+        return ((self.player_count_A11 < 21 or self.player_count_A1 < 21) and
+                (self.player_count_A11 != 21 and self.player_count_A1 != 21))
+
+    # Dealer draws while behind the player and under a hard 17
+    def dealer_should_hit(self):
+        scores = self.score_check()
+        return scores[1] != -1 and scores[0] > scores[1] and self.dealer_count_A1 < 17
+
+    # Plays out the dealer's hand
+    def dealer_turn(self):
+        while self.dealer_should_hit():
+            self.dealer_play('H')
+
+    # Settles the hand once it is over: returns result() and pays or
+    # collects the bet on 'bankroll' (a Bankroll) if one is given
+    def settle(self, bankroll=None):
+        result = self.result()
+        if bankroll is not None:
+            bankroll.settle(result)
+        return result
+
+    # 1 if the player wins, 0 for a push, -1 if the dealer wins
+    def result(self):
+        scores = self.score_check()
+        if scores[0] > scores[1]:
+            return 1
+        elif scores[0] == scores[1]:
+            return 0
+        else:
+            return -1
+
+
     def score_check(self):
         
         all_scores = [(self.player_count_A11, self.player_count_A1),(self.dealer_count_A11, self.dealer_count_A1)]
@@ -0,0 +1,136 @@
+'''
+Binary hand-history recording and streaming replay.
+
+A history file is a 16-byte header followed by one fixed-width record per
+hand, so hand n always starts at HEADER.size + n * RECORD.size:
+
+    bet             uint32
+    result          int8     1 player win, 0 push, -1 dealer win
+    player_count    uint8    cards in the player's hand
+    dealer_count    uint8    cards in the dealer's hand
+    decision_count  uint8    number of hit/stand decisions
+    decisions       uint16   bit i set when decision i was a hit
+    player_cards    16 x uint8 card numbers, zero padded
+    dealer_cards    16 x uint8 card numbers, zero padded
+
+Records are buffered and written in batches like Ledger, and replay()
+memory-maps the file and yields one hand at a time.
+
+'''
+
+import mmap
+import os
+import struct
+from collections import namedtuple
+
+MAGIC = b"BJHH"
+VERSION = 1
+MAX_CARDS = 16
+
+HEADER = struct.Struct("<4sHH8x")
+RECORD = struct.Struct(f"<IbBBBH{MAX_CARDS}s{MAX_CARDS}s")
+
+HandRecord = namedtuple("HandRecord", "bet result player_cards dealer_cards decisions")
+
+
+# The decisions behind a finished hand: one hit per drawn card, then a
+# stand unless the player stopped on 21 or bust
+def decisions_of(deck):
+    decisions = 'H' * (len(deck.player_hand) - 2)
+    if deck.player_can_hit():
+        decisions += 'S'
+    return decisions
+
+
+class HandHistory():
+
+    __slots__ = ("path", "batch_size", "buffer", "pending", "file")
+
+    def __init__(self, path, batch_size=4096):
+        self.path = path
+        self.batch_size = batch_size
+        self.buffer = bytearray(RECORD.size * batch_size)
+        self.pending = 0
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        else:
+            check_header(path)
+
+    def record(self, deck, bet, result, decisions=None):
+        '''
+        Adds the hand currently in 'deck'. 'decisions' is a string of
+        'H'/'S' and is worked out from the cards when not given.
+
+        '''
+        if len(deck.player_hand) > MAX_CARDS or len(deck.dealer_hand) > MAX_CARDS:
+            raise ValueError(f"Hands of more than {MAX_CARDS} cards cannot be recorded")
+        if decisions is None:
+            decisions = decisions_of(deck)
+
+        mask = 0
+        for i, decision in enumerate(decisions):
+            if decision == 'H':
+                mask |= 1 << i
+
+        RECORD.pack_into(self.buffer, self.pending * RECORD.size,
+                         bet, result, len(deck.player_hand), len(deck.dealer_hand),
+                         len(decisions), mask,
+                         deck.player_hand.tobytes(), deck.dealer_hand.tobytes())
+        self.pending += 1
+        if self.pending == self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.file.write(memoryview(self.buffer)[:self.pending * RECORD.size])
+            self.pending = 0
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def check_header(path):
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+    if len(header) != HEADER.size or HEADER.unpack(header) != (MAGIC, VERSION, RECORD.size):
+        raise ValueError(f"{path} is not a version {VERSION} hand history")
+
+
+def hand_count(path):
+    return (os.path.getsize(path) - HEADER.size) // RECORD.size
+
+
+def replay(path, start=0, stop=None):
+    '''
+    Yields HandRecords for hands start to stop (default: all) straight
+    from a memory map of the file, so only the hand being looked at is
+    ever decoded.
+
+    '''
+    check_header(path)
+    count = hand_count(path)
+    stop = count if stop is None else min(stop, count)
+    if start >= stop:
+        return
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        records = memoryview(view)[HEADER.size + start * RECORD.size:HEADER.size + stop * RECORD.size]
+        unpacked = RECORD.iter_unpack(records)
+        try:
+            for bet, result, n_player, n_dealer, n_decisions, mask, player, dealer in unpacked:
+                decisions = "".join('H' if mask >> i & 1 else 'S' for i in range(n_decisions))
+                yield HandRecord(bet, result, player[:n_player], dealer[:n_dealer], decisions)
+        finally:
+            # The map can only close once nothing points into it
+            del unpacked
+            records.release()
@@ -0,0 +1,115 @@
+'''
+Append-only binary ledger of bankroll transactions.
+
+Each transaction is one fixed-width little-endian record:
+
+    session  uint32   which simulated session it belongs to
+    kind     uint8    one of the entry kinds below
+    amount   int64    amount moved (or the bet placed)
+    balance  int64    player bankroll after the transaction
+
+Records are packed into an in-memory buffer and written in batches, and
+read back through a memory map, so millions of transactions cost a handful
+of system calls.
+
+'''
+
+import mmap
+import os
+import struct
+
+RECORD = struct.Struct("<IBqq")
+
+DEPOSIT = 0
+WITHDRAW = 1
+BET = 2
+WIN = 3
+LOSS = 4
+PUSH = 5
+
+KIND_NAMES = ("deposit", "withdraw", "bet", "win", "loss", "push")
+
+
+class Ledger():
+
+    __slots__ = ("path", "batch_size", "buffer", "pending", "file")
+
+    def __init__(self, path, batch_size=4096):
+        self.path = path
+        self.batch_size = batch_size
+        self.buffer = bytearray(RECORD.size * batch_size)
+        self.pending = 0
+        self.file = open(path, "ab")
+
+    def record(self, session, kind, amount, balance):
+        RECORD.pack_into(self.buffer, self.pending * RECORD.size, session, kind, amount, balance)
+        self.pending += 1
+        if self.pending == self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.file.write(memoryview(self.buffer)[:self.pending * RECORD.size])
+            self.pending = 0
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return (os.path.getsize(self.path) + self.pending * RECORD.size) // RECORD.size
+
+
+def read_ledger(path):
+    '''
+    Yields (session, kind, amount, balance) tuples from a ledger file
+    without loading it into memory.
+
+    '''
+    if os.path.getsize(path) == 0:
+        return
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        # Ignore a partial trailing record left by an interrupted write
+        end = len(view) - len(view) % RECORD.size
+        records = memoryview(view)[:end]
+        unpacked = RECORD.iter_unpack(records)
+        try:
+            yield from unpacked
+        finally:
+            # The map can only close once nothing points into it
+            del unpacked
+            records.release()
+
+
+def audit(path):
+    '''
+    Replays a ledger and checks that every session's balances add up.
+    Returns a dict of session -> final balance; raises ValueError on the
+    first record that does not follow from the one before it.
+
+    '''
+    balances = {}
+    for i, (session, kind, amount, balance) in enumerate(read_ledger(path)):
+        before = balances.get(session, 0)
+        if kind in (DEPOSIT, WIN):
+            expected = before + amount
+        elif kind in (WITHDRAW, LOSS):
+            expected = before - amount
+        else:
+            expected = before
+
+        if balance != expected:
+            raise ValueError(f"Record {i} ({KIND_NAMES[kind]}) of session {session} "
+                             f"has balance {balance}, expected {expected}")
+        balances[session] = balance
+
+    return balances
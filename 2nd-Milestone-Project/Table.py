@@ -0,0 +1,100 @@
+'''
+Event-driven blackjack table.
+
+The play_game() flow as a state machine: each player action is a method
+call that moves the table on and returns a snapshot of its state, so the
+same game can be driven by input() prompts, a simulation or a server
+handling thousands of tables at once.
+
+    betting --bet()--> player --hit()/stand()--> over --bet()--> player ...
+
+'''
+
+from Deck import Deck, CARD_LABEL, show_hand
+from Bankroll import Bankroll
+
+BETTING = "betting"
+PLAYER_TURN = "player"
+HAND_OVER = "over"
+
+
+class Table():
+
+    __slots__ = ("table_id", "deck", "bankroll", "phase", "result", "hands_played", "history")
+
+    # Finished hands are written to 'history' (a HandHistory) if given
+    def __init__(self, table_id=0, deck=None, bankroll=None, history=None):
+        self.table_id = table_id
+        self.deck = deck if deck is not None else Deck(decks=6)
+        self.bankroll = bankroll if bankroll is not None else Bankroll(interactive=False)
+        self.phase = BETTING
+        self.result = None
+        self.hands_played = 0
+        self.history = history
+
+    # Internal module
+    def require(self, *phases):
+        if self.phase not in phases:
+            raise ValueError(f"Table {self.table_id} is in the '{self.phase}' phase")
+
+    def deposit(self, amount):
+        self.require(BETTING, HAND_OVER)
+        self.bankroll.deposit(amount)
+        return self.state()
+
+    def withdraw(self, amount):
+        self.require(BETTING, HAND_OVER)
+        self.bankroll.withdraw(amount)
+        return self.state()
+
+    # Places the bet and deals the hand
+    def bet(self, amount, true_count=None):
+        self.require(BETTING, HAND_OVER)
+        self.bankroll.bet(amount, true_count)
+        self.deck.new_hand()
+        self.deck.deal()
+        self.phase = PLAYER_TURN
+        self.result = None
+        return self.state()
+
+    def hit(self):
+        self.require(PLAYER_TURN)
+        self.deck.player_play('H')
+        if not self.deck.player_can_hit():
+            self.finish()
+        return self.state()
+
+    def stand(self):
+        self.require(PLAYER_TURN)
+        self.deck.player_play('S')
+        self.finish()
+        return self.state()
+
+    # Internal module: dealer's turn and settlement
+    def finish(self):
+        self.deck.dealer_turn()
+
+        self.result = self.deck.settle(self.bankroll)
+        if self.history is not None:
+            self.history.record(self.deck, self.bankroll.curr_bet, self.result)
+        self.phase = HAND_OVER
+        self.hands_played += 1
+
+    def state(self):
+        deck = self.deck
+        state = {"table": self.table_id,
+                 "phase": self.phase,
+                 "bankroll": self.bankroll.player_bank,
+                 "bet": self.bankroll.curr_bet}
+
+        if self.phase == PLAYER_TURN:
+            state["dealer"] = [CARD_LABEL[deck.dealer_hand[0]]]
+            state["player"] = show_hand(deck.player_hand)
+            state["player_count"] = (deck.player_count_A11, deck.player_count_A1)
+        elif self.phase == HAND_OVER:
+            state["dealer"] = show_hand(deck.dealer_hand)
+            state["player"] = show_hand(deck.player_hand)
+            state["player_count"] = (deck.player_count_A11, deck.player_count_A1)
+            state["dealer_count"] = (deck.dealer_count_A11, deck.dealer_count_A1)
+            state["result"] = self.result
+        return state
@@ -0,0 +1,160 @@
+'''
+Benchmarks for the blackjack hot paths.
+
+Times Deck.draw_card, Deck.reshuffle, Deck.tally, Deck.score_check and a
+full headless hand, measures memory per table, and writes the results as JSON. Passing
+an earlier results file flags anything that got slower (or bigger) by more
+than the tolerance.
+
+    python benchmark.py [results.json] [baseline.json]
+
+'''
+
+import json
+import platform
+import time
+import tracemalloc
+
+from Deck import Deck
+from Table import Table
+from simulate import play_hand, hit_under_17
+
+TOLERANCE = 0.10
+
+
+def percentiles(values):
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    return {"p50": ordered[last // 2],
+            "p90": ordered[last * 90 // 100],
+            "p99": ordered[last * 99 // 100],
+            "max": ordered[last]}
+
+
+def time_calls(fn, samples=2000, per_sample=100, setup=None):
+    '''
+    Returns the mean ns per call of 'fn' for each of 'samples' runs of
+    'per_sample' calls. Timing in small runs keeps the clock overhead out
+    of the figures while still giving a latency distribution. 'setup', if
+    given, is called before each run outside the timed window.
+
+    '''
+    timings = []
+    calls = range(per_sample)
+    for i in range(samples):
+        if setup is not None:
+            setup()
+        start = time.perf_counter_ns()
+        for j in calls:
+            fn()
+        timings.append((time.perf_counter_ns() - start) / per_sample)
+    return timings
+
+
+def bench_draw_card(per_sample=100):
+    deck = Deck(decks=8, penetration=1.0)
+    deck.shuffle()
+
+    # Reshuffle between runs rather than inside one, so only draws are timed
+    def refill():
+        if deck.cursor + per_sample > len(deck.shoe):
+            deck.reshuffle()
+
+    return percentiles(time_calls(deck.draw_card, per_sample=per_sample, setup=refill))
+
+
+def bench_reshuffle():
+    deck = Deck(decks=8, penetration=1.0)
+    return percentiles(time_calls(deck.reshuffle, samples=200, per_sample=10))
+
+
+def bench_tally():
+    deck = Deck()
+    deck.shuffle()
+    deck.turn = 'Player'
+    deck.draw_card()
+    return percentiles(time_calls(deck.tally))
+
+
+def bench_score_check():
+    deck = Deck()
+    deck.shuffle()
+    deck.deal()
+    return percentiles(time_calls(deck.score_check))
+
+
+def bench_hand(hands=20000):
+    deck = Deck(decks=6)
+    start = time.perf_counter()
+    for i in range(hands):
+        play_hand(deck, hit_under_17)
+    elapsed = time.perf_counter() - start
+
+    result = percentiles(time_calls(lambda: play_hand(deck, hit_under_17), samples=500, per_sample=10))
+    result["hands_per_sec"] = hands / elapsed
+    return result
+
+
+def bench_table_memory(tables=2000):
+    tracemalloc.start()
+    live = [Table(i) for i in range(tables)]
+    for table in live:
+        table.deposit(100)
+        table.bet(1)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"bytes_per_table": current / tables, "peak_bytes_per_table": peak / tables}
+
+
+BENCHMARKS = {"draw_card_ns": bench_draw_card,
+              "reshuffle_ns": bench_reshuffle,
+              "tally_ns": bench_tally,
+              "score_check_ns": bench_score_check,
+              "hand_ns": bench_hand,
+              "table_memory": bench_table_memory}
+
+
+def run_all():
+    results = {"python": platform.python_version(), "time": time.time()}
+    for name, bench in BENCHMARKS.items():
+        results[name] = bench()
+    return results
+
+
+def compare(current, baseline, tolerance=TOLERANCE):
+    '''
+    Returns a line for every p50, hands/sec or memory figure that is more
+    than 'tolerance' worse than in 'baseline'.
+
+    '''
+    regressions = []
+    for name in BENCHMARKS:
+        for key, new in current.get(name, {}).items():
+            old = baseline.get(name, {}).get(key)
+            if not old or key not in ("p50", "hands_per_sec", "bytes_per_table"):
+                continue
+            # Higher is better only for throughput
+            change = (old - new) / old if key == "hands_per_sec" else (new - old) / old
+            if change > tolerance:
+                regressions.append(f"{name}.{key}: {old:,.1f} -> {new:,.1f} ({change:+.0%} worse)")
+    return regressions
+
+
+if __name__ == "__main__":
+    import sys
+
+    output = sys.argv[1] if len(sys.argv) > 1 else "benchmark_results.json"
+    results = run_all()
+
+    for name in BENCHMARKS:
+        print(f"{name}: " + ", ".join(f"{k}={v:,.1f}" for k, v in results[name].items()))
+
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nSaved to {output}")
+
+    if len(sys.argv) > 2:
+        with open(sys.argv[2]) as f:
+            regressions = compare(results, json.load(f))
+        print("\n".join(regressions) if regressions else "No regressions")
+        sys.exit(1 if regressions else 0)
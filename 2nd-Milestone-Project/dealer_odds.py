@@ -0,0 +1,82 @@
+'''
+Exact dealer outcome probabilities for a given upcard and shoe.
+
+A shoe composition is a tuple of 10 counts: aces, 2s up to 9s, then all
+ten-value cards. The dealer's hand is played out recursively over every
+card that could come next, weighted by how many of it are left, and each
+(hand, composition) result is kept in an LRU-bounded memo so repeat
+queries come straight from the cache.
+
+Hands are scored and drawn to with the same rules as strategy.py.
+
+'''
+
+from functools import lru_cache
+
+from Deck import CARD_VALUE_A1
+from strategy import HARD, DEALER_RULES, add_card, best_total
+
+# Final totals are indexed 0-21 with a bust stored at index 22
+BUST = 22
+
+CACHE_SIZE = 1 << 18
+
+
+def composition_of(cards):
+    '''
+    Returns the composition tuple for an iterable of card numbers.
+
+    '''
+    counts = [0] * 10
+    for num in cards:
+        counts[CARD_VALUE_A1[num] - 1] += 1
+    return tuple(counts)
+
+
+# Cards the player has not seen: the rest of the shoe plus the hole card
+def unseen_composition(deck):
+    counts = list(deck.remaining)
+    for num in deck.dealer_hand[1:2]:
+        counts[CARD_VALUE_A1[num] - 1] += 1
+    return tuple(counts)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def final_totals(hard, kind, composition, rules="s17", player_total=0):
+    '''
+    Probability of each final dealer total (see BUST) from the given hand,
+    drawing from 'composition'.
+
+    '''
+    remaining = sum(composition)
+    if remaining == 0 or not DEALER_RULES[rules](hard, kind, player_total):
+        dist = [0.0] * 23
+        total = best_total(hard, kind)
+        dist[BUST if total == -1 else total] = 1.0
+        return tuple(dist)
+
+    dist = [0.0] * 23
+    for i, count in enumerate(composition):
+        if count:
+            rest = composition[:i] + (count - 1,) + composition[i+1:]
+            outcome = final_totals(*add_card(hard, kind, i + 1), rest, rules, player_total)
+            prob = count / remaining
+            for total, p in enumerate(outcome):
+                if p:
+                    dist[total] += prob * p
+    return tuple(dist)
+
+
+def dealer_distribution(upcard, composition, rules="s17", player_total=0):
+    '''
+    Returns {final total: probability} for a dealer showing 'upcard'
+    (1 for an ace up to 10) whose hole card and draws come from
+    'composition'. A bust is reported as -1, as in score_check().
+
+    'player_total' only matters for the "house" rule, where the dealer
+    stops drawing once ahead of the player.
+
+    '''
+    hard, kind = add_card(0, HARD, upcard)
+    dist = final_totals(hard, kind, tuple(composition), rules, player_total)
+    return {(-1 if total == BUST else total): p for total, p in enumerate(dist) if p}
@@ -0,0 +1,115 @@
+'''
+Opt-in instrumentation for the blackjack game loop.
+
+InstrumentedDeck is a drop-in Deck that counts and times the deal, dealer
+turn and settlement (Deck.settle(), including the bankroll) of every hand
+and each player decision, and counts score_check() calls per hand. Plain
+Decks carry no hooks at all, so there is nothing to pay when
+instrumentation is off.
+
+    instruments = Instruments()
+    simulate(deck=InstrumentedDeck(instruments), hands=100000)
+    print(instruments.summary())
+
+'''
+
+from time import perf_counter_ns
+
+from Deck import Deck
+
+# Every phase is timed once per hand except player_decision, which is
+# timed per player_play() call (one per hit or stand)
+PHASES = ("deal", "player_decision", "dealer_turn", "settlement")
+
+
+class Instruments():
+
+    __slots__ = ("hands", "score_checks", "hand_score_checks", "max_score_checks",
+                 "calls", "total_ns", "max_ns")
+
+    def __init__(self):
+        self.hands = 0
+        self.score_checks = 0
+        self.hand_score_checks = 0
+        self.max_score_checks = 0
+        self.calls = dict.fromkeys(PHASES, 0)
+        self.total_ns = dict.fromkeys(PHASES, 0)
+        self.max_ns = dict.fromkeys(PHASES, 0)
+
+    # Internal module
+    def start_hand(self):
+        if self.hand_score_checks > self.max_score_checks:
+            self.max_score_checks = self.hand_score_checks
+        self.hand_score_checks = 0
+        self.hands += 1
+
+    # Internal module
+    def add(self, phase, start_ns):
+        elapsed = perf_counter_ns() - start_ns
+        self.calls[phase] += 1
+        self.total_ns[phase] += elapsed
+        if elapsed > self.max_ns[phase]:
+            self.max_ns[phase] = elapsed
+
+    def summary(self):
+        '''
+        Returns a JSON-ready dict of per-phase call counts and timings and
+        score_check() calls per hand.
+
+        '''
+        hands = self.hands or 1
+        total = sum(self.total_ns.values()) or 1
+        phases = {}
+        for phase in PHASES:
+            calls = self.calls[phase]
+            phases[phase] = {"calls": calls,
+                             "total_ms": self.total_ns[phase] / 1e6,
+                             "mean_us": self.total_ns[phase] / calls / 1e3 if calls else 0.0,
+                             "max_us": self.max_ns[phase] / 1e3,
+                             "share": self.total_ns[phase] / total}
+
+        return {"hands": self.hands,
+                "phases": phases,
+                "score_checks": self.score_checks,
+                "score_checks_per_hand": self.score_checks / hands,
+                "max_score_checks_in_a_hand": max(self.max_score_checks, self.hand_score_checks)}
+
+
+class InstrumentedDeck(Deck):
+
+    __slots__ = ("instruments",)
+
+    def __init__(self, instruments=None, **deck_args):
+        super().__init__(**deck_args)
+        self.instruments = instruments if instruments is not None else Instruments()
+
+    def new_hand(self):
+        self.instruments.start_hand()
+        super().new_hand()
+
+    def deal(self):
+        start = perf_counter_ns()
+        super().deal()
+        self.instruments.add("deal", start)
+
+    def player_play(self, hit_stand):
+        start = perf_counter_ns()
+        hit_stand = super().player_play(hit_stand)
+        self.instruments.add("player_decision", start)
+        return hit_stand
+
+    def dealer_turn(self):
+        start = perf_counter_ns()
+        super().dealer_turn()
+        self.instruments.add("dealer_turn", start)
+
+    def settle(self, bankroll=None):
+        start = perf_counter_ns()
+        result = super().settle(bankroll)
+        self.instruments.add("settlement", start)
+        return result
+
+    def score_check(self):
+        self.instruments.score_checks += 1
+        self.instruments.hand_score_checks += 1
+        return super().score_check()
@@ -0,0 +1,92 @@
+'''
+Parallel Monte Carlo EV estimator.
+
+Splits N hands into shards that run simulate() in a process pool and
+merges the tallies. Every shard deals from its own random.Random seeded
+from (seed, shard number), so a run is reproducible for a given seed and
+shard count no matter how many workers pick up the shards.
+
+'''
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from math import sqrt
+from random import Random
+
+from simulate import simulate, hit_under_17
+
+COUNT_KEYS = ("hands", "wins", "pushes", "losses", "player_busts", "dealer_busts", "net_units")
+
+
+# Internal module
+def run_shard(job):
+    strategy, hands, seed, shard, decks, penetration = job
+    # String seeds are hashed with SHA-512, giving independent streams per shard
+    rng = Random(f"{seed}:{shard}")
+    return simulate(strategy, hands=hands, decks=decks, penetration=penetration, rng=rng)
+
+
+def merge_results(results):
+    '''
+    Sums per-shard tallies and works out the EV per unit bet, its standard
+    error and the Kelly bet fraction (0 when the EV is negative).
+
+    '''
+    merged = dict.fromkeys(COUNT_KEYS, 0)
+    for result in results:
+        for key in COUNT_KEYS:
+            merged[key] += result[key]
+
+    hands = merged["hands"]
+    ev = merged["net_units"] / hands if hands else 0.0
+    # Every hand pays -1, 0 or +1 so the mean square is the decided fraction
+    variance = (merged["wins"] + merged["losses"]) / hands - ev**2 if hands else 0.0
+
+    merged["house_edge"] = -ev
+    merged["ev"] = ev
+    merged["std_error"] = sqrt(variance / hands) if hands else 0.0
+    merged["kelly_fraction"] = max(ev / variance, 0.0) if variance else 0.0
+    return merged
+
+
+def estimate_ev(strategy=hit_under_17, hands=1000000, seed=0, shards=None, workers=None,
+                decks=6, penetration=0.75):
+    '''
+    Estimates the EV of 'strategy' over 'hands' hands spread across
+    'shards' shards (default: one per core) and 'workers' processes
+    (default: one per core).
+
+    The strategy must be picklable, e.g. a module-level function or a
+    StrategyTable.
+
+    '''
+    cores = os.cpu_count() or 1
+    shards = shards or cores
+
+    # Spread the remainder so shard sizes differ by at most one hand
+    size, extra = divmod(hands, shards)
+    jobs = [(strategy, size + (shard < extra), seed, shard, decks, penetration)
+            for shard in range(shards)]
+
+    with ProcessPoolExecutor(max_workers=workers or cores) as pool:
+        results = list(pool.map(run_shard, jobs))
+
+    merged = merge_results(results)
+    merged["shards"] = shards
+    return merged
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    hands = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    start = time.perf_counter()
+    results = estimate_ev(hands=hands, workers=workers)
+    elapsed = time.perf_counter() - start
+
+    for key, value in results.items():
+        print(f"{key}: {value}")
+    print(f"{hands / elapsed:,.0f} hands/sec on {workers or os.cpu_count()} workers")
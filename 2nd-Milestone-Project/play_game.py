@@ -1,12 +1,17 @@
-from Deck import Deck
+from Deck import Deck, CARD_LABEL, show_hand
 from Bankroll import Bankroll
+from Table import Table, PLAYER_TURN
+from instrument import InstrumentedDeck
 
-def play_game():
+# Pass an instrument.Instruments to collect per-phase timings of the hand
+def play_game(instruments=None):
     
-    deck = Deck()
-    bankroll = Bankroll()
-    
-    deck.shuffle()
+    if instruments is None:
+        deck = Deck()
+    else:
+        deck = InstrumentedDeck(instruments)
+    table = Table(deck=deck, bankroll=Bankroll())
+    bankroll = table.bankroll
     
     print(f"Current bankroll is {bankroll.player_bank}")
     dep_draw = input("Deposit/Withdraw? D/W or Enter to pass: ").upper()
@@ -17,7 +22,7 @@ def play_game():
             try:
                 if bankroll.player_bank <=0:
                     print("Sorry your bankroll is 0!")
-                bankroll.deposit(int(input("Please enter deposit amount: ")))
+                table.deposit(int(input("Please enter deposit amount: ")))
             except:
                 print("Whoops! That is not a number")
             else:
@@ -27,76 +32,59 @@ def play_game():
     if dep_draw == "W":
         while True:
             try:
-                bankroll.withdraw(int(input("Please enter withdraw amount: ")))
+                table.withdraw(int(input("Please enter withdraw amount: ")))
             except:
                 print("Whoops! That is not a number")
             else:
                 break
     
-    # BANKROLL: Place bet
+    # BANKROLL: Place bet, which deals the hand
     while True:
         try:
-            bankroll.bet(int(input("Please place your bet: ")))
+            table.bet(int(input("Please place your bet: ")))
         except:
             print("Whoops! That is not a number")
         else:
             break
     
-    
-    # RUN GAME (Consider adding to 'Game' class as .deal_game)
-    for i in range(4):
-        if deck.turn == 'Player':
-            deck.turn = 'Dealer'
-        else:
-            deck.turn = 'Player'
-        
-        deck.draw_card()
-        deck.tally()
             
-    print(f"Dealer: {deck.dealer_hand[0]}")
-    print(f"Player: {deck.player_hand}")
+    print(f"Dealer: {CARD_LABEL[deck.dealer_hand[0]]}")
+    print(f"Player: {show_hand(deck.player_hand)}")
     print(f"Player count: {deck.player_count_A11} & {deck.player_count_A1}")
     
-    play = True
-    hit_stand = ''
-    while play:
+    # The table plays the dealer's turn and settles once the player is done
+    while table.phase == PLAYER_TURN:
         invalid_play = True
         while invalid_play:
             hit_stand = input("Hit or stand? H/S: ").upper()
             invalid_play = (hit_stand != 'H' and hit_stand != 'S')
             if invalid_play:
                 print ("Please enter either 'H' or 'S'.")                      
-        deck.player_play(hit_stand)  
-        print(f"\nPlayer: {deck.player_hand}")
+        if hit_stand == 'H':
+            table.hit()
+        else:
+            table.stand()
+        print(f"\nPlayer: {show_hand(deck.player_hand)}")
         print(f"Player count: {deck.player_count_A11} & {deck.player_count_A1}")
-        play = ((deck.player_count_A11 < 21 or deck.player_count_A1 < 21) and
-               (deck.player_count_A11 != 21 and deck.player_count_A1 != 21) and hit_stand == "H")
     
     if deck.player_count_A11 > 21 and deck.player_count_A1 > 21:
         # Player loses
         print("Bust")
-    else:
-        while (deck.score_check()[1] != -1) and (deck.score_check()[0]  > deck.score_check()[1]) and (deck.dealer_count_A1 < 17):
-            deck.dealer_play("H")       
     
     print("\n")
-    print(deck.player_hand)
-    print(deck.dealer_hand)
-    print(deck.dealt)
+    print(show_hand(deck.player_hand))
+    print(show_hand(deck.dealer_hand))
+    print(show_hand(deck.dealt))
     print(f"Player count: {deck.player_count_A11} & {deck.player_count_A1}")
     print(f"Dealer count: {deck.dealer_count_A11} & {deck.dealer_count_A1}")
         
-    if deck.score_check()[0]  > deck.score_check()[1]:        
+    if table.result == 1:
         print("Player wins!")
-        bankroll.player_bank += bankroll.curr_bet
-        print(f"Your bankroll is now: {bankroll.player_bank}")
-    elif deck.score_check()[0] == deck.score_check()[1]:
+    elif table.result == 0:
         print("Push! Bets returned")
-        print(f"Your bankroll is now: {bankroll.player_bank}")
     else:
         print("Dealer wins!")
-        bankroll.player_bank -= bankroll.curr_bet
-        print(f"Your bankroll is now: {bankroll.player_bank}")
+    print(f"Your bankroll is now: {bankroll.player_bank}")
         
     make_deposit = "N"
     make_withdraw = "N"
\ No newline at end of file
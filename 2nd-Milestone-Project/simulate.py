@@ -0,0 +1,121 @@
+'''
+Headless blackjack simulation.
+
+Plays hands with the same rules as play_game() but without any input() or
+print() calls, so the house edge of a strategy can be measured over millions
+of hands.
+
+A strategy is any callable taking the Deck and returning 'H' or 'S'.
+
+'''
+
+from array import array
+from Deck import Deck
+
+# Outcome codes stored per hand in each batch
+PLAYER_BUST = -2
+DEALER_WIN = -1
+PUSH = 0
+PLAYER_WIN = 1
+DEALER_BUST = 2
+
+
+# Example strategy: keep hitting until reaching at least 17
+def hit_under_17(deck):
+    if deck.score_check()[0] < 17:
+        return 'H'
+    return 'S'
+
+
+def play_hand(deck, strategy):
+    '''
+    Plays one hand from the shoe and returns its outcome code.
+
+    '''
+    deck.new_hand()
+    deck.deal()
+
+    play = True
+    while play:
+        hit_stand = deck.player_play(strategy)
+        play = deck.player_can_hit() and hit_stand == "H"
+
+    deck.dealer_turn()
+
+    # Every hand is settled exactly once, busts included. A hand is bust
+    # when even its ace-as-1 count is over 21, so no further score_check()
+    # is needed to tell busts apart
+    result = deck.settle()
+    if deck.player_count_A1 > 21:
+        return PLAYER_BUST
+    elif deck.dealer_count_A1 > 21:
+        return DEALER_BUST
+    return result
+
+
+# Deck.result() value of an outcome code: 1 win, 0 push, -1 loss
+def outcome_result(code):
+    return (code > 0) - (code < 0)
+
+
+def simulate(strategy=hit_under_17, hands=1000000, batch_size=10000,
+             decks=6, penetration=0.75, rng=None, history=None, deck=None):
+    '''
+    Plays 'hands' hands in batches of 'batch_size' and returns the
+    aggregate results as a dict. Hands are dealt from one shoe of 'decks'
+    decks, reshuffled once 'penetration' of it has been dealt, using 'rng'
+    (a random.Random) if given. Every hand is also written to 'history'
+    (a HandHistory) with a bet of 1 if one is given. Passing 'deck' (such
+    as an InstrumentedDeck) plays from it instead of a new shoe.
+
+    Each batch writes one outcome code per hand into a fixed array which
+    is then tallied with array.count(), so nothing is kept per hand once a
+    batch is done.
+
+    '''
+    if deck is None:
+        deck = Deck(decks=decks, penetration=penetration, rng=rng)
+    outcomes = array('b', bytes(batch_size))
+    tally = dict.fromkeys((PLAYER_BUST, DEALER_WIN, PUSH, PLAYER_WIN, DEALER_BUST), 0)
+
+    played = 0
+    while played < hands:
+        size = min(batch_size, hands - played)
+        if history is None:
+            for i in range(size):
+                outcomes[i] = play_hand(deck, strategy)
+        else:
+            for i in range(size):
+                outcomes[i] = play_hand(deck, strategy)
+                history.record(deck, 1, outcome_result(outcomes[i]))
+
+        batch = outcomes if size == batch_size else outcomes[:size]
+        for code in tally:
+            tally[code] += batch.count(code)
+        played += size
+
+    wins = tally[PLAYER_WIN] + tally[DEALER_BUST]
+    losses = tally[DEALER_WIN] + tally[PLAYER_BUST]
+
+    return {"hands": played,
+            "wins": wins,
+            "pushes": tally[PUSH],
+            "losses": losses,
+            "player_busts": tally[PLAYER_BUST],
+            "dealer_busts": tally[DEALER_BUST],
+            "net_units": wins - losses,
+            "house_edge": (losses - wins) / played if played else 0.0}
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    hands = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    start = time.perf_counter()
+    results = simulate(hands=hands)
+    elapsed = time.perf_counter() - start
+
+    for key, value in results.items():
+        print(f"{key}: {value}")
+    print(f"{hands / elapsed:,.0f} hands/sec")
@@ -0,0 +1,226 @@
+'''
+Basic-strategy solver.
+
+Works out the best hit/stand decision for every (player total, hand kind,
+dealer upcard) cell by dynamic programming over the draw probabilities of
+an infinite shoe, using the same scoring as Deck.score_check(). Note that
+scoring counts every ace in a hand the same way, so a second ace turns a
+soft hand into a hard one.
+
+Solved tables are saved under 'strategy_cache' keyed by rule set, so they
+are only ever computed once.
+
+'''
+
+import os
+from functools import lru_cache
+
+from Deck import CARD_VALUE_A1
+
+# Hand kinds: no aces, one ace counted as 11, aces that can only count as 1
+HARD = 0
+SOFT = 1
+LOW_ACE = 2
+
+STAND = 0
+HIT = 1
+
+# Card values 1 (ace) to 10 and their chance of being drawn
+CARD_PROBS = tuple((value, 4/13 if value == 10 else 1/13) for value in range(1, 11))
+
+# Table cells are indexed by kind, hard total (aces as 1) and upcard value
+TABLE_SIZE = 3 * 22 * 11
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "strategy_cache")
+
+
+# Internal module
+def add_card(hard, kind, value):
+    hard += value
+    if value == 1:
+        if kind == HARD and hard + 10 <= 21:
+            kind = SOFT
+        else:
+            kind = LOW_ACE
+    elif kind == SOFT and hard + 10 > 21:
+        kind = LOW_ACE
+    return hard, kind
+
+
+# Same result as score_check(): best total, or -1 when bust
+def best_total(hard, kind):
+    if hard > 21:
+        return -1
+    elif kind == SOFT:
+        return hard + 10
+    return hard
+
+
+# Same rule as Deck.player_can_hit()
+def can_hit(hard, kind):
+    total = best_total(hard, kind)
+    return total != -1 and total != 21 and hard != 21
+
+
+# Dealer draw rules, given the dealer's hand and the player's standing total
+def house_rule(hard, kind, player_total):
+    dealer = best_total(hard, kind)
+    return dealer != -1 and player_total > dealer and hard < 17
+
+def s17_rule(hard, kind, player_total):
+    dealer = best_total(hard, kind)
+    return dealer != -1 and dealer < 17
+
+def h17_rule(hard, kind, player_total):
+    dealer = best_total(hard, kind)
+    return dealer != -1 and (dealer < 17 or (dealer == 17 and kind == SOFT))
+
+DEALER_RULES = {"house": house_rule, "s17": s17_rule, "h17": h17_rule}
+
+
+@lru_cache(maxsize=None)
+def dealer_ev(hard, kind, player_total, rules):
+    '''
+    Expected result for the player (1 win, 0 push, -1 loss) once the dealer
+    plays out from the given hand against a standing player_total.
+
+    '''
+    if DEALER_RULES[rules](hard, kind, player_total):
+        return sum(prob * dealer_ev(*add_card(hard, kind, value), player_total, rules)
+                   for value, prob in CARD_PROBS)
+
+    dealer = best_total(hard, kind)
+    return (player_total > dealer) - (player_total < dealer)
+
+
+@lru_cache(maxsize=None)
+def stand_ev(player_total, upcard, rules):
+    hard, kind = add_card(0, HARD, upcard)
+    # The dealer's hole card is always drawn
+    return sum(prob * dealer_ev(*add_card(hard, kind, value), player_total, rules)
+               for value, prob in CARD_PROBS)
+
+
+@lru_cache(maxsize=None)
+def player_ev(hard, kind, upcard, rules):
+    '''
+    Returns (expected result, decision) for the player's best play.
+
+    '''
+    total = best_total(hard, kind)
+    if total == -1:
+        return -1.0, STAND
+
+    stand = stand_ev(total, upcard, rules)
+    if not can_hit(hard, kind):
+        return stand, STAND
+
+    hit = sum(prob * player_ev(*add_card(hard, kind, value), upcard, rules)[0]
+              for value, prob in CARD_PROBS)
+    if hit > stand:
+        return hit, HIT
+    return stand, STAND
+
+
+def cell_index(hard, kind, upcard):
+    return (kind * 22 + min(hard, 21)) * 11 + upcard
+
+
+class StrategyTable():
+    '''
+    Solved hit/stand decisions for one rule set, one byte per cell.
+
+    Tables are strategy callables: table(deck) returns 'H' or 'S' for the
+    player's current hand, so one can be passed to Deck.player_play() or
+    simulate().
+
+    '''
+
+    __slots__ = ("rules", "cells")
+
+    def __init__(self, rules, cells):
+        self.rules = rules
+        self.cells = cells
+
+    def lookup(self, hard, kind, upcard):
+        if self.cells[cell_index(hard, kind, upcard)] == HIT:
+            return 'H'
+        return 'S'
+
+    def decide(self, deck):
+        hard = deck.player_count_A1
+        if deck.player_count_A11 == hard:
+            kind = HARD
+        elif deck.player_count_A11 <= 21:
+            kind = SOFT
+        else:
+            kind = LOW_ACE
+        return self.lookup(hard, kind, CARD_VALUE_A1[deck.dealer_hand[0]])
+
+    __call__ = decide
+
+
+def solve(rules="house"):
+    '''
+    Builds the StrategyTable for 'rules' (one of DEALER_RULES).
+
+    '''
+    if rules not in DEALER_RULES:
+        raise ValueError(f"Unknown rule set {rules!r}, expected one of {sorted(DEALER_RULES)}")
+
+    cells = bytearray(TABLE_SIZE)
+    for kind in (HARD, SOFT, LOW_ACE):
+        for hard in range(2, 22):
+            if kind == SOFT and hard + 10 > 21:
+                continue
+            for upcard in range(1, 11):
+                cells[cell_index(hard, kind, upcard)] = player_ev(hard, kind, upcard, rules)[1]
+
+    return StrategyTable(rules, bytes(cells))
+
+
+_loaded = {}
+
+def load_table(rules="house", cache_dir=CACHE_DIR):
+    '''
+    Returns the StrategyTable for 'rules', reading it from 'cache_dir' if it
+    has been solved before and solving and saving it otherwise.
+
+    '''
+    if rules in _loaded:
+        return _loaded[rules]
+
+    path = os.path.join(cache_dir, f"basic_strategy_{rules}.bin")
+    try:
+        with open(path, "rb") as f:
+            cells = f.read()
+    except FileNotFoundError:
+        cells = b""
+
+    if len(cells) == TABLE_SIZE:
+        table = StrategyTable(rules, cells)
+    else:
+        table = solve(rules)
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write then rename so a half-written file is never loaded
+        with open(path + ".tmp", "wb") as f:
+            f.write(table.cells)
+        os.replace(path + ".tmp", path)
+
+    _loaded[rules] = table
+    return table
+
+
+if __name__ == "__main__":
+    import sys
+
+    rules = sys.argv[1] if len(sys.argv) > 1 else "house"
+    table = load_table(rules)
+
+    print(f"Rule set: {rules}\n")
+    print("        " + " ".join(f"{'A' if up == 1 else up:>2}" for up in range(1, 11)))
+    for kind, name in ((HARD, "Hard"), (SOFT, "Soft")):
+        for hard in range(4 if kind == HARD else 2, 22 if kind == HARD else 12):
+            total = hard + 10 if kind == SOFT else hard
+            row = " ".join(f"{table.lookup(hard, kind, up):>2}" for up in range(1, 11))
+            print(f"{name} {total:>2} {row}")
@@ -0,0 +1,196 @@
+'''
+asyncio blackjack server.
+
+Hosts any number of Tables in one process behind a local TCP or Unix
+socket. Clients send one JSON object per line and get one back:
+
+    {"cmd": "open"}                              -> new table id
+    {"cmd": "deposit", "table": 1, "amount": 100}
+    {"cmd": "bet", "table": 1, "amount": 10}     -> deals the hand
+    {"cmd": "hit", "table": 1}
+    {"cmd": "stand", "table": 1}
+    {"cmd": "close", "table": 1}
+    {"cmd": "metrics"}                           -> latency per table
+
+Every table has its own Deck and Bankroll. Game actions never block, so
+they run straight on the event loop, and the time taken to handle each
+request is recorded per table.
+
+'''
+
+import asyncio
+import json
+import time
+from array import array
+
+from Table import Table
+
+ACTIONS = ("deposit", "withdraw", "bet", "hit", "stand")
+
+
+class LatencyStats():
+    '''
+    Request handling times for one table, keeping the last 'window'
+    samples (in microseconds) for percentiles.
+
+    '''
+
+    __slots__ = ("count", "total_us", "max_us", "samples")
+
+    def __init__(self, window=256):
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+        self.samples = array('I', bytes(4 * window))
+
+    def add(self, micros):
+        self.samples[self.count % len(self.samples)] = micros
+        self.count += 1
+        self.total_us += micros
+        if micros > self.max_us:
+            self.max_us = micros
+
+    def summary(self):
+        recent = sorted(self.samples[:min(self.count, len(self.samples))])
+        if not recent:
+            return {"requests": 0}
+        return {"requests": self.count,
+                "mean_us": self.total_us / self.count,
+                "p50_us": recent[len(recent) // 2],
+                "p99_us": recent[min(len(recent) - 1, len(recent) * 99 // 100)],
+                "max_us": self.max_us}
+
+
+BAD_REQUEST = "Requests must be one JSON object per line"
+
+
+class TableServer():
+
+    def __init__(self):
+        self.tables = {}
+        self.latency = {}
+        self.next_id = 1
+
+    def open_table(self):
+        table_id = self.next_id
+        self.next_id += 1
+        self.tables[table_id] = Table(table_id)
+        self.latency[table_id] = LatencyStats()
+        return {"table": table_id}
+
+    def handle(self, request):
+        '''
+        Runs one decoded request and returns the response dict. Failures
+        come back as {"error": message} rather than dropping the client.
+
+        '''
+        start = time.perf_counter_ns()
+        if not isinstance(request, dict):
+            return {"error": BAD_REQUEST}
+        cmd = request.get("cmd")
+        table_id = request.get("table")
+        # A list or object can never name a table (and cannot be looked up)
+        if isinstance(table_id, (list, dict)):
+            return {"error": f"No table {table_id}"}
+
+        try:
+            if cmd == "open":
+                return self.open_table()
+            elif cmd == "metrics":
+                return {"tables": {tid: stats.summary() for tid, stats in self.latency.items()}}
+            elif table_id not in self.tables:
+                return {"error": f"No table {table_id}"}
+            elif cmd == "close":
+                del self.tables[table_id]
+                return {"closed": table_id, "latency": self.latency.pop(table_id).summary()}
+            elif cmd in ACTIONS:
+                table = self.tables[table_id]
+                if "amount" in request:
+                    response = getattr(table, cmd)(int(request["amount"]))
+                else:
+                    response = getattr(table, cmd)()
+            else:
+                return {"error": f"Unknown command {cmd!r}"}
+        # OverflowError: an 'amount' of Infinity or 1e400 cannot be an int
+        except (TypeError, ValueError, OverflowError) as error:
+            response = {"error": str(error)}
+
+        if table_id in self.latency:
+            self.latency[table_id].add((time.perf_counter_ns() - start) // 1000)
+        return response
+
+    async def serve_client(self, reader, writer):
+        try:
+            while line := await reader.readline():
+                try:
+                    response = self.handle(json.loads(line))
+                # JSONDecodeError and UnicodeDecodeError are both ValueErrors
+                except ValueError:
+                    response = {"error": BAD_REQUEST}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=8765, path=None):
+        if path is not None:
+            return await asyncio.start_unix_server(self.serve_client, path=path)
+        return await asyncio.start_server(self.serve_client, host, port)
+
+
+async def play_remote(host, port, hands, strategy_total=17):
+    '''
+    Example client: opens a table and plays 'hands' hands, hitting below
+    'strategy_total'. Returns the final bankroll.
+
+    '''
+    reader, writer = await asyncio.open_connection(host, port)
+
+    async def send(**request):
+        writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        return json.loads(await reader.readline())
+
+    table_id = (await send(cmd="open"))["table"]
+    state = await send(cmd="deposit", table=table_id, amount=10 * hands)
+    for i in range(hands):
+        state = await send(cmd="bet", table=table_id, amount=1)
+        while state["phase"] == "player":
+            if max(c for c in state["player_count"] if c <= 21) < strategy_total:
+                state = await send(cmd="hit", table=table_id)
+            else:
+                state = await send(cmd="stand", table=table_id)
+
+    writer.close()
+    await writer.wait_closed()
+    return state["bankroll"]
+
+
+async def main(port, clients, hands):
+    table_server = TableServer()
+    server = await table_server.start(port=port)
+    async with server:
+        if not clients:
+            print(f"Serving tables on 127.0.0.1:{port}")
+            await server.serve_forever()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(play_remote("127.0.0.1", port, hands) for i in range(clients)))
+        elapsed = time.perf_counter() - start
+
+        summaries = [stats.summary() for stats in table_server.latency.values()]
+        print(f"{clients} tables, {clients * hands / elapsed:,.0f} hands/sec")
+        print(f"Worst table p99: {max(s['p99_us'] for s in summaries)} us, "
+              f"max: {max(s['max_us'] for s in summaries)} us")
+
+
+if __name__ == "__main__":
+    import sys
+
+    # python table_server.py [port] [demo clients] [hands per client]
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    hands = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    asyncio.run(main(port, clients, hands))
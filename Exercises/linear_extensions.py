@@ -0,0 +1,274 @@
+# Every ordering consistent with a set of pairwise comparisons
+#
+# An ordering consistent with the pairs (a linear extension) is built from
+# the top down by repeatedly placing a name whose superiors are all placed
+# already. So the names placed so far always form a "downset", which is
+# kept as a bitmask, and
+#
+#     above[S]  orderings of the names in S as the top |S| places
+#     below[S]  orderings of the other names under them
+#
+# are counted by dynamic programming over the downsets, one layer per
+# place. above[everyone] is the number of consistent orderings, and
+# above[S] * below[S + name] counts those with 'name' in place |S|, which
+# gives exact rank distributions. Walking down choosing each next name in
+# proportion to below[] samples orderings exactly uniformly.
+#
+# Before that the names are split into segments wherever the top k names
+# are the same in every consistent ordering (found from the longest chain
+# of superiors above each name). Segments are ordered independently, so a
+# nearly decided ranking of many names becomes many tiny problems, and
+# the orderings multiply. A segment of more than MAX_NAMES names or with
+# more than 'limit' downsets falls back to a Markov chain that swaps
+# neighbours at random, which estimates its rank distributions from
+# 'samples' sweeps (one step per name each, at most MAX_STEPS steps in all
+# after a quarter as many to warm up) but cannot count or sample it.
+
+import random
+from collections import namedtuple
+
+from ranking import intern_names, rank
+
+MAX_STATES = 1 << 16
+MAX_NAMES = 1024
+MAX_STEPS = 4000000
+
+# position: most likely place (0 is the top); probability: chance of it
+Placing = namedtuple("Placing", "name position probability")
+
+
+# Splits 'order' (ids in a consistent order) into runs that keep their
+# places in every consistent ordering. A cut before place k is safe when
+# every later name has a chain of at least k superiors: it then has at
+# least k names above it and can never rise into the top k.
+def split_segments(order, successors):
+    depth = [0] * len(order)
+    for node in order:
+        for below in successors[node]:
+            if depth[below] <= depth[node]:
+                depth[below] = depth[node] + 1
+
+    cuts = []
+    lowest = len(order)
+    for place in range(len(order) - 1, 0, -1):
+        lowest = min(lowest, depth[order[place]])
+        if lowest >= place:
+            cuts.append(place)
+    cuts.reverse()
+
+    start = 0
+    for cut in cuts + [len(order)]:
+        yield start, order[start:cut]
+        start = cut
+
+
+class Segment():
+    '''
+    Exact counts for one segment. Names are numbered 0 to n - 1 in a
+    consistent order; 'layers' is None if the segment is too big.
+
+    '''
+
+    __slots__ = ("size", "superiors", "inferiors", "ready", "layers", "below", "count")
+
+    def __init__(self, size, edges, limit):
+        self.size = size
+        self.superiors = [0] * size         # bitmask of direct superiors
+        self.inferiors = [[] for v in range(size)]
+        for above, below in edges:
+            self.superiors[below] |= 1 << above
+            self.inferiors[above].append(below)
+        # ready[S]: bitmask of names that can take the next place after S
+        self.ready = {0: sum(1 << v for v, superiors in enumerate(self.superiors) if not superiors)}
+
+        self.layers = self._count(limit) if size <= MAX_NAMES else None
+        if self.layers is None:
+            self.ready = self.below = self.count = None
+        else:
+            self.count = self.layers[-1][(1 << size) - 1]
+            self.below = self._count_below()
+
+    # Internal module: names that can take the next place after downset S
+    def _available(self, placed):
+        ready = self.ready[placed]
+        while ready:
+            bit = ready & -ready
+            ready ^= bit
+            yield bit.bit_length() - 1
+
+    # Internal module: above[] one layer per place, or None past 'limit'
+    def _count(self, limit):
+        layers = [{0: 1}]
+        states = 1
+        for place in range(self.size):
+            layer = {}
+            for placed, ways in layers[-1].items():
+                for v in self._available(placed):
+                    nxt = placed | 1 << v
+                    if nxt not in layer:
+                        # Only names just below v can have become ready
+                        ready = self.ready[placed] & ~(1 << v)
+                        for w in self.inferiors[v]:
+                            if self.superiors[w] & ~nxt == 0:
+                                ready |= 1 << w
+                        self.ready[nxt] = ready
+                        layer[nxt] = 0
+                        states += 1
+                        if states > limit:
+                            return None
+                    layer[nxt] += ways
+            layers.append(layer)
+        return layers
+
+    # Internal module: below[] for every downset, from the bottom place up
+    def _count_below(self):
+        below = {(1 << self.size) - 1: 1}
+        for layer in reversed(self.layers[:-1]):
+            for placed in layer:
+                below[placed] = sum(below[placed | 1 << v] for v in self._available(placed))
+        return below
+
+    # {place: chance} for every name, only for places it can take
+    def distribution(self):
+        counts = [{} for v in range(self.size)]
+        for place, layer in enumerate(self.layers[:-1]):
+            for placed, ways in layer.items():
+                for v in self._available(placed):
+                    counts[v][place] = counts[v].get(place, 0) + ways * self.below[placed | 1 << v]
+        return [{place: ways / self.count for place, ways in row.items()} for row in counts]
+
+    def sample(self, rng):
+        placed = 0
+        order = []
+        for place in range(self.size):
+            pick = rng.randrange(self.below[placed])
+            for v in self._available(placed):
+                pick -= self.below[placed | 1 << v]
+                if pick < 0:
+                    break
+            placed |= 1 << v
+            order.append(v)
+        return order
+
+
+# Estimates {place: chance} for every name of a segment with random
+# neighbour swaps that keep the order consistent. Rather than copying the
+# order for each sample, every name's time spent in each place is added
+# up as it moves, so each step costs O(1).
+def estimate_distribution(size, neighbours, sweeps, rng):
+    order = list(range(size))
+    if size == 1:
+        return [{0: 1.0}]
+
+    def swap(i):
+        order[i], order[i + 1] = order[i + 1], order[i]
+
+    steps = min(sweeps * size, MAX_STEPS)
+    for step in range(steps // 4):
+        i = rng.randrange(size - 1)
+        if rng.random() < 0.5 and (order[i], order[i + 1]) not in neighbours:
+            swap(i)
+
+    since = [0] * size
+    occupied = [{} for v in range(size)]
+    for step in range(steps):
+        i = rng.randrange(size - 1)
+        a, b = order[i], order[i + 1]
+        if rng.random() < 0.5 and (a, b) not in neighbours:
+            for v, held in ((a, i), (b, i + 1)):
+                occupied[v][held] = occupied[v].get(held, 0) + step - since[v]
+                since[v] = step
+            swap(i)
+
+    for held, v in enumerate(order):
+        occupied[v][held] = occupied[v].get(held, 0) + steps - since[v]
+    return [{held: occupied[v][held] / steps for held in sorted(occupied[v])} for v in range(size)]
+
+
+class LinearExtensions():
+
+    __slots__ = ("names", "segments", "exact", "count", "_distribution")
+
+    def __init__(self, pairs, limit=MAX_STATES, samples=2000, rng=None):
+        names, edges = intern_names(pairs)
+        result = rank(pairs)
+        if result.cycle:
+            raise ValueError(f"Pairs contain a cycle: {' > '.join(map(str, result.cycle))}")
+
+        ids = {name: v for v, name in enumerate(names)}
+        successors = [[] for name in names]
+        for above, below in edges:
+            successors[above].append(below)
+        rng = rng or random.Random()
+
+        self.names = names
+        self.segments = []          # (first place, ids in segment, Segment or None)
+        self._distribution = [None] * len(names)
+        self.count = 1
+        for start, members in split_segments([ids[name] for name in result.order], successors):
+            local = {v: i for i, v in enumerate(members)}
+            local_edges = {(local[v], local[w]) for v in members for w in successors[v] if w in local}
+
+            segment = Segment(len(members), local_edges, limit)
+            if segment.count is not None:
+                self.count *= segment.count
+                rows = segment.distribution()
+            else:
+                self.count = None
+                segment = None
+                rows = estimate_distribution(len(members), local_edges, samples, rng)
+            self.segments.append((start, members, segment))
+            for v, row in zip(members, rows):
+                self._distribution[v] = {start + place: chance for place, chance in row.items()}
+
+        self.exact = self.count is not None
+
+    def distribution(self):
+        '''
+        Returns {name: {place: chance}} for every place (0 is the top) the
+        name can take, exact when self.exact.
+
+        '''
+        return dict(zip(self.names, self._distribution))
+
+    def placings(self):
+        '''
+        Every name's most likely place and its chance, from the top down.
+
+        '''
+        result = []
+        for name, row in zip(self.names, self._distribution):
+            position = max(row, key=row.get)
+            result.append(Placing(name, position, row[position]))
+        result.sort(key=lambda placing: placing.position)
+        return result
+
+    def sample(self, rng=random):
+        '''
+        Returns one consistent ordering chosen uniformly at random (exact
+        mode only).
+
+        '''
+        if not self.exact:
+            raise ValueError("Too many orderings to sample exactly; raise 'limit'")
+        order = []
+        for start, members, segment in self.segments:
+            order.extend(self.names[members[i]] for i in segment.sample(rng))
+        return order
+
+
+if __name__ == "__main__":
+    rankings = [
+    ["Einstein", "Feynmann"],
+    ["Feynmann", "Gell-Mann"],
+    ["Gell-Mann", "Thorne"],
+    ["Einstein", "Lorentz"],
+    ["Lorentz", 'Planck'],
+    ["Hilbert", "Noether"],
+    ["Poincare", "Noether"]
+    ]
+
+    analysis = LinearExtensions(rankings)
+    print(f"{analysis.count} consistent orderings, for example:\n{analysis.sample()}\n")
+    for name, row in analysis.distribution().items():
+        print(f"{name:>10}: " + " ".join(f"{place}:{chance:.2f}" for place, chance in row.items()))
@@ -0,0 +1,153 @@
+# Online ranking as comparisons arrive (dynamic topological ordering)
+#
+# Keeps a valid order of every name seen so far while pairs are added one
+# at a time, using the Pearce-Kelly algorithm. A pair that already agrees
+# with the current order costs O(1). Otherwise only the names positioned
+# between the two (and reachable from them) are searched and shuffled, so
+# the rest of the order is never touched. A pair that would create a cycle
+# is rejected before anything changes.
+
+
+class OnlineRanking():
+
+    __slots__ = ("ids", "names", "successors", "predecessors", "position", "node_at", "rejected")
+
+    def __init__(self, pairs=()):
+        self.ids = {}
+        self.names = []
+        self.successors = []
+        self.predecessors = []
+        self.position = []      # position[id] is the name's place in the order
+        self.node_at = []       # node_at[place] is the id of the name there
+        # (above, below, cycle) for every pair turned down
+        self.rejected = []
+        for above, below in pairs:
+            self.add(above, below)
+
+    # Internal module: new names go to the bottom of the order
+    def _id(self, name):
+        if name not in self.ids:
+            node = len(self.names)
+            self.ids[name] = node
+            self.names.append(name)
+            self.successors.append(set())
+            self.predecessors.append(set())
+            self.position.append(node)
+            self.node_at.append(node)
+        return self.ids[name]
+
+    def add(self, above, below):
+        '''
+        Records that 'above' ranks above 'below'. Returns True if the order
+        was kept valid, or False (recording the cycle in 'rejected') if the
+        pair contradicts the ones already accepted.
+
+        '''
+        x = self._id(above)
+        y = self._id(below)
+        if y in self.successors[x]:
+            return True
+
+        if x == y:
+            self.rejected.append((above, below, [above]))
+            return False
+
+        lower, upper = self.position[y], self.position[x]
+        if lower > upper:
+            # Already in order
+            self.successors[x].add(y)
+            self.predecessors[y].add(x)
+            return True
+
+        # Names below 'below' that currently sit no lower than 'above'
+        forward = self._search(y, self.successors, lambda p: p <= upper, x)
+        if forward is None:
+            self.rejected.append((above, below, self._cycle_path(x, y)))
+            return False
+        # Names above 'above' that currently sit no higher than 'below'
+        backward = self._search(x, self.predecessors, lambda p: p >= lower, None)
+
+        self.successors[x].add(y)
+        self.predecessors[y].add(x)
+        self._reorder(backward, forward)
+        return True
+
+    # Internal module: depth-first search from 'start' through nodes whose
+    # position passes 'in_region'; None if 'target' is reached
+    def _search(self, start, edges, in_region, target):
+        seen = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for nxt in edges[node]:
+                if nxt == target:
+                    return None
+                if nxt not in seen and in_region(self.position[nxt]):
+                    seen.add(nxt)
+                    stack.append(nxt)
+        return seen
+
+    # Internal module: the path below -> ... -> above that the pair would close
+    def _cycle_path(self, x, y):
+        parent = {y: None}
+        stack = [y]
+        while stack:
+            node = stack.pop()
+            if node == x:
+                break
+            for nxt in self.successors[node]:
+                if nxt not in parent:
+                    parent[nxt] = node
+                    stack.append(nxt)
+        path = []
+        node = x
+        while node is not None:
+            path.append(self.names[node])
+            node = parent[node]
+        path.reverse()
+        return [self.names[x]] + path[:-1]
+
+    # Internal module: moves the 'backward' names ahead of the 'forward'
+    # ones, reusing only the positions they already held
+    def _reorder(self, backward, forward):
+        backward = sorted(backward, key=self.position.__getitem__)
+        forward = sorted(forward, key=self.position.__getitem__)
+        nodes = backward + forward
+        places = sorted(self.position[node] for node in nodes)
+        for node, place in zip(nodes, places):
+            self.position[node] = place
+            self.node_at[place] = node
+
+    def order(self):
+        return [self.names[node] for node in self.node_at]
+
+    def is_above(self, a, b):
+        '''
+        True if 'a' comes before 'b' in the current order (which is implied
+        by, but does not imply, a chain of pairs from a to b).
+
+        '''
+        return self.position[self.ids[a]] < self.position[self.ids[b]]
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    from ranking import rank
+
+    names = [f"name{i}" for i in range(20000)]
+    truth = names[:]
+    random.shuffle(truth)
+    pairs = [(truth[i], truth[i + 1]) for i in range(len(truth) - 1)]
+    random.shuffle(pairs)
+
+    start = time.perf_counter()
+    online = OnlineRanking()
+    for above, below in pairs:
+        online.add(above, below)
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(pairs)} pairs added in {elapsed:.2f} s, order matches: {online.order() == truth}")
+    print(f"Adding a contradiction: {online.add(truth[-1], truth[0])}, rejected: {len(online.rejected)}")
+    print(f"Batch re-rank gives the same order: {rank(pairs).order == online.order()}")
@@ -0,0 +1,97 @@
+# Exact ranking of pairwise comparisons (see smartest-in-room.py)
+#
+# Each pair [a, b] means a ranks above b. Kahn's algorithm repeatedly takes
+# a name that nobody left ranks above, which orders the names in O(V + E)
+# in one pass. The order is the only one consistent with the pairs exactly
+# when there is never more than one such name to choose from. If names are
+# left over at the end, the pairs contain a cycle, which is returned.
+
+from collections import deque, namedtuple
+
+# order:  names from highest to lowest (only the acyclic part on a cycle)
+# unique: True if no other order fits the pairs
+# cycle:  names forming a cycle, each above the next and the last above
+#         the first, or None
+Ranking = namedtuple("Ranking", "order unique cycle")
+
+
+def intern_names(pairs):
+    '''
+    Gives every name an id in order of first appearance. Returns the
+    list of names and the list of (id, id) edges.
+
+    '''
+    ids = {}
+    edges = []
+    for above, below in pairs:
+        edges.append((ids.setdefault(above, len(ids)), ids.setdefault(below, len(ids))))
+    return list(ids), edges
+
+
+def find_cycle(indegree, predecessors):
+    # Every name left over still has a predecessor that is left over, so
+    # walking back through them must come round to a name already seen
+    node = next(i for i, degree in enumerate(indegree) if degree > 0)
+    seen = {}
+    path = []
+    while node not in seen:
+        seen[node] = len(path)
+        path.append(node)
+        node = next(p for p in predecessors[node] if indegree[p] > 0)
+    cycle = path[seen[node]:]
+    cycle.reverse()
+    return cycle
+
+
+def rank(pairs):
+    '''
+    Ranks the names in 'pairs' and returns a Ranking.
+
+    '''
+    names, edges = intern_names(pairs)
+    successors = [[] for name in names]
+    indegree = [0] * len(names)
+    for above, below in edges:
+        successors[above].append(below)
+        indegree[below] += 1
+
+    ready = deque(i for i, degree in enumerate(indegree) if degree == 0)
+    order = []
+    unique = True
+    while ready:
+        if len(ready) > 1:
+            unique = False
+        node = ready.popleft()
+        order.append(node)
+        for below in successors[node]:
+            indegree[below] -= 1
+            if indegree[below] == 0:
+                ready.append(below)
+
+    cycle = None
+    if len(order) < len(names):
+        predecessors = [[] for name in names]
+        for above, below in edges:
+            predecessors[below].append(above)
+        cycle = [names[i] for i in find_cycle(indegree, predecessors)]
+        unique = False
+
+    return Ranking([names[i] for i in order], unique, cycle)
+
+
+if __name__ == "__main__":
+    rankings = [
+    ["Einstein", "Feynmann"],
+    ["Feynmann", "Gell-Mann"],
+    ["Gell-Mann", "Thorne"],
+    ["Einstein", "Lorentz"],
+    ["Lorentz", 'Planck'],
+    ["Hilbert", "Noether"],
+    ["Poincare", "Noether"]
+    ]
+
+    result = rank(rankings)
+    print(f"Unique ordering: {result.unique}")
+    if result.cycle:
+        print(f"Cycle: {' > '.join(result.cycle)}")
+    print('\n'.join(f"{i}: {name}" for i, name in enumerate(result.order)))
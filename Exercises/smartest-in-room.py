@@ -1,8 +1,7 @@
-import random
-n = 15
+from bradley_terry import fit
+from linear_extensions import LinearExtensions
 
-# Note algorithm is not a robust sort
-# It only works if initial order is assumed as presented below
+# Each pair [a, b] means a ranks above b
 rankings = [
 ["Einstein", "Feynmann"],
 ["Feynmann", "Gell-Mann"],
@@ -13,51 +12,29 @@ rankings = [
 ["Poincare", "Noether"]
 ]
 
-# Flatten data
-source_with_dups = [name for pair in rankings for name in pair]
-source = []
-for name in source_with_dups:
-    if name not in source:
-        source.append(name)
-
-# Assign result-instance counts for multiple rounds with shuffled inputs
-source_count = {}
-for name in source:
-    source_count[name] = {}
-    for i in range(len(source)):
-        source_count[name][i] = 0
-
-# Shuffles the order of pairs 'n' times for testing
-for i in range(n):
-    uniques = source
-    random.shuffle(rankings)
-    
-    # This bubble-sorts the list
-    for pair in rankings:
-        if uniques.index(pair[0]) > uniques.index(pair[1]):
-            uniques.insert(uniques.index(pair[1]),uniques.pop(uniques.index(pair[0])))    
-    
-    # This counts the result-instances and stores in 'source_count'
-    for j, name in enumerate(uniques):
-        source_count[name][j] += 1
-    
-    #Uncomment below line to see inside loop (n times)
-    #print(f"\n\nRandom Order Round {i+1}\nRanking shuffled: {rankings}\n\nUnique set after: {uniques}")
-
-
-# Checks whether input rankings-data is good
-list_integrity = True
-final_result = {}
-for key in source_count:
-    v = list(source_count[key].values())
-    k = list(source_count[key].keys())
-    final_result[key] = k[v.index(max(v))]
-    if list_integrity == False:
-        False
+# Counts every ordering consistent with the rankings instead of shuffling
+# the pairs 'n' times, so the answer is exact rather than a random estimate
+try:
+    analysis = LinearExtensions(rankings)
+except ValueError as error:
+    # Contradicting pairs: rate everyone by how often they came out on top
+    print(f"List data is good: False ({error})\n")
+    ratings, rounds = fit(rankings)
+    print('\n'.join(f"{rating.name}: {rating.score:.0f} +/- {rating.error:.0f}" for rating in ratings))
+else:
+    # Rankings-data is good when no pairs contradict each other
+    print("List data is good: True")
+    if not analysis.exact:
+        print("Consistent orderings: too many to count\n")
+    elif analysis.count == 1:
+        print("Consistent orderings: 1 (the ranking is unique)\n")
     else:
-        list_integrity =  n == v[v.index(max(v))]
+        print(f"Consistent orderings: {analysis.count}\n")
 
-ordered_result = sorted(final_result.items(), key = lambda x: x[1])
+    # Most likely place for each name and its chance
+    ordered_result = [(placing.name, placing.position, round(placing.probability, 3))
+                      for placing in analysis.placings()]
+    print('\n'.join(map(str, ordered_result)))
 
-print(f"List data is good: {list_integrity} on {n} tries\n")
-print('\n'.join(map(str, ordered_result)))
\ No newline at end of file
+    #Uncomment below line to see every name's chance of each place
+    #print('\n'.join(f"{name}: {row}" for name, row in analysis.distribution().items()))
@@ -79,24 +79,69 @@ def convertToBase(dec_num,base=16):
     return base_num
 
 
+# Digits decoded one at a time into each chunk before combining
+CHUNK_DIGITS = 18
+
+# Char -> digit value lookups and chunk powers, built once per base
+_digit_tables = {}
+_chunk_powers = {}
+
+
+# Creates a table mapping each digit's byte to its value for respective base
+def setDigitTable(base):
+
+    if base not in _digit_tables:
+        table = bytearray([0xFF]) * 256
+        for k, v in setMapping(base).items():
+            table[ord(str(v))] = k
+        _digit_tables[base] = bytes(table)
+
+    return _digit_tables[base]
+
+
+# Powers base**(CHUNK_DIGITS * 2**level), squared from the last one as needed
+def chunkPower(base, level):
+
+    powers = _chunk_powers.setdefault(base, [base ** CHUNK_DIGITS])
+    while len(powers) <= level:
+        powers.append(powers[-1] * powers[-1])
+
+    return powers[level]
+
+
 # Conversion method for base to decimal
 def convertToDec(base_num,base=16):
 
     base = alphanumCheck(base)
-    mapping_dict = setMapping(base)
+    table = setDigitTable(base)
 
-    # Initialise num where final output will be stored
-    dec_num = 0
-    
-    # Iterate through base number in reverse to extract digits
-    # Multiply each digit to respective power of 10 and add to final num
-    for i,digit in enumerate(str(base_num)[::-1]):
-        
-        # Converts alphanum digit in decimal representation
-        for k,v in mapping_dict.items():
-            if str(v) == digit:
-                digit = k
-        
-        dec_num += digit * base**i
-                
-    return dec_num
\ No newline at end of file
+    # Translate every digit to its value in one pass, rejecting unknown ones
+    # (non-ASCII chars become '?', which is not a digit in any base)
+    digits = str(base_num)
+    values = digits.encode('ascii', 'replace').translate(table)
+    if 0xFF in values:
+        raise ValueError("'{}' is not a base {} digit".format(digits[values.index(0xFF)], base))
+
+    # Decode fixed-size chunks from the right, least significant first
+    # (the leftmost chunk takes whatever digits are left over)
+    chunks = []
+    for end in range(len(values), 0, -CHUNK_DIGITS):
+        chunk = 0
+        for digit in values[max(0, end - CHUNK_DIGITS):end]:
+            chunk = chunk * base + digit
+        chunks.append(chunk)
+
+    # Combine neighbouring chunks pairwise, doubling their size each round,
+    # so the big multiplications happen on balanced halves
+    level = 0
+    while len(chunks) > 1:
+        power = chunkPower(base, level)
+        paired = [chunks[i] + chunks[i + 1] * power for i in range(0, len(chunks) - 1, 2)]
+        if len(chunks) % 2:
+            paired.append(chunks[-1])
+        chunks = paired
+        level += 1
+
+    dec_num = chunks[0] if chunks else 0
+
+    return dec_num
@@ -0,0 +1,174 @@
+#Bitboard tic-tac-toe engine with a perfect-play solver
+#
+#The board is two 9-bit masks, one per player. Bit n is cell n+1 in the
+#numbering used by tic-tac-toe.py:
+#
+#    1 | 2 | 3
+#    4 | 5 | 6
+#    7 | 8 | 9
+#
+#X always moves first, so whoever is to move follows from the counts.
+
+WIN_MASKS = (0b000000111, 0b000111000, 0b111000000,   #rows
+             0b001001001, 0b010010010, 0b100100100,   #columns
+             0b100010001, 0b001010100)                #diagonals
+FULL = 0b111111111
+
+#WINNING[mask] is 1 if 'mask' holds any of the 8 lines
+WINNING = bytes(any(mask & win == win for win in WIN_MASKS) for mask in range(512))
+
+
+#the 8 symmetries of the square as cell permutations: SYMMETRIES[s][n] is
+#where cell n goes under symmetry s
+def _symmetries():
+    rotate = (6, 3, 0, 7, 4, 1, 8, 5, 2)
+    mirror = (2, 1, 0, 5, 4, 3, 8, 7, 6)
+    perms = []
+    perm = tuple(range(9))
+    for i in range(4):
+        perms.append(perm)
+        perms.append(tuple(mirror[n] for n in perm))
+        perm = tuple(rotate[n] for n in perm)
+    return perms
+
+SYMMETRIES = _symmetries()
+
+#SYM_MASKS[s][mask] is 'mask' moved by symmetry s, precomputed for all 512 masks
+SYM_MASKS = tuple(tuple(sum(1 << perm[n] for n in range(9) if mask >> n & 1) for mask in range(512))
+                  for perm in SYMMETRIES)
+
+
+def is_win(mask):
+    return WINNING[mask] == 1
+
+
+def x_to_move(x, o):
+    return x.bit_count() == o.bit_count()
+
+
+def legal_moves(x, o):
+    empty = FULL & ~(x | o)
+    return [n for n in range(9) if empty >> n & 1]
+
+
+#the same position for every symmetry maps to one key
+def canonical(x, o):
+    return min(table[x] | table[o] << 9 for table in SYM_MASKS)
+
+
+#transposition table: canonical key -> score for the player to move
+_table = {}
+
+def negamax(me, them):
+    '''
+    Scores the position for the player to move, whose stones are 'me':
+    10 - stones played for a win (so faster wins score higher), the
+    negative of that for a loss and 0 for a draw.
+
+    '''
+    key = canonical(me, them)
+    if key in _table:
+        return _table[key]
+
+    filled = me | them
+    if filled == FULL:
+        score = 0
+    else:
+        score = -10
+        empty = FULL & ~filled
+        while empty:
+            bit = empty & -empty
+            empty ^= bit
+            mine = me | bit
+            if WINNING[mine]:
+                score = 10 - mine.bit_count() - them.bit_count()
+                break
+            score = max(score, -negamax(them, mine))
+
+    _table[key] = score
+    return score
+
+
+def score_moves(x, o):
+    '''
+    Returns {cell number 1-9: score} for every legal move of the player to
+    move, from that player's point of view.
+
+    '''
+    me, them = (x, o) if x_to_move(x, o) else (o, x)
+    scores = {}
+    for n in legal_moves(x, o):
+        mine = me | 1 << n
+        if WINNING[mine]:
+            scores[n + 1] = 10 - mine.bit_count() - them.bit_count()
+        else:
+            scores[n + 1] = -negamax(them, mine)
+    return scores
+
+
+def best_move(x, o):
+    scores = score_moves(x, o)
+    return max(scores, key=scores.get)
+
+
+def solve():
+    '''
+    Solves the whole game from the empty board. Returns the game value
+    (0: a draw with perfect play) and the number of positions stored.
+
+    '''
+    return negamax(0, 0), len(_table)
+
+
+#converts a tic-tac-toe.py style 'cells' dict to (x, o) masks
+def from_cells(cells):
+    x = o = 0
+    for n in range(9):
+        mark = cells['key_' + str(n + 1)].strip()
+        if mark == 'X':
+            x |= 1 << n
+        elif mark == 'O':
+            o |= 1 << n
+    return x, o
+
+
+def board_string(x, o):
+    marks = []
+    for n in range(9):
+        if x >> n & 1:
+            marks.append(' X ')
+        elif o >> n & 1:
+            marks.append(' O ')
+        else:
+            marks.append('[' + str(n + 1) + ']')
+    rows = ["  {0}  |  {1}  |  {2}".format(*marks[i:i+3]) for i in (0, 3, 6)]
+    return ("\n       |       |    \n"
+            + "\n_______|_______|_______\n       |       |    \n".join(rows)
+            + "\n       |       |    ")
+
+
+#play against perfect play from the opening book: the human is X and moves first
+if __name__ == "__main__":
+    from opening_book import OpeningBook
+
+    book = OpeningBook()
+
+    x = o = 0
+    while True:
+        print(board_string(x, o))
+        if is_win(x) or is_win(o) or x | o == FULL:
+            break
+        if x_to_move(x, o):
+            move = ""
+            while move not in [str(n + 1) for n in legal_moves(x, o)]:
+                move = input("Your (X) move: ")
+            x |= 1 << (int(move) - 1)
+        else:
+            o |= 1 << (book.best_move(x, o) - 1)
+
+    if is_win(x):
+        print("\nYou win!")
+    elif is_win(o):
+        print("\nThe computer wins!")
+    else:
+        print("\nDraw game :)")
@@ -0,0 +1,106 @@
+#Self-contained tic-tac-toe game state
+#
+#tic-tac-toe.py keeps one game in module globals. A Game keeps everything
+#for one game on the object, with the board as two bitmasks (see
+#bitboard.py), so any number of games can run side by side in one process,
+#each driven by its own thread or task. A move is validated with a single
+#mask test instead of scanning a list of entered moves.
+
+from bitboard import FULL, WINNING, board_string
+
+SYMBOLS = ('X', 'O')
+
+
+class Game():
+
+    __slots__ = ("player_1", "player_2", "x", "o", "play_count", "winner")
+
+    def __init__(self, player_1="Player 1", player_2="Player 2"):
+        self.player_1 = player_1
+        self.player_2 = player_2
+        self.x = 0              #cells taken by player 1 (X)
+        self.o = 0              #cells taken by player 2 (O)
+        self.play_count = 0
+        self.winner = None
+
+    #player 1 has the odd plays, as in tic-tac-toe.py
+    @property
+    def current_player(self):
+        return self.player_1 if self.play_count % 2 == 0 else self.player_2
+
+    @property
+    def symbol(self):
+        return SYMBOLS[self.play_count % 2]
+
+    def is_valid(self, move):
+        '''
+        True if 'move' (1-9, as an int or string) is a free cell in a game
+        that is still being played.
+
+        '''
+        try:
+            cell = int(move) - 1
+        except (TypeError, ValueError):
+            return False
+        return 0 <= cell < 9 and not (self.x | self.o) >> cell & 1 and not self.is_over()
+
+    def make_move(self, move):
+        '''
+        Marks cell 'move' (1-9) for the current player. Returns True if the
+        move won the game; raises ValueError for a move that is not allowed.
+
+        '''
+        if not self.is_valid(move):
+            raise ValueError("Please enter a new number from 1 to 9")
+
+        bit = 1 << (int(move) - 1)
+        if self.play_count % 2 == 0:
+            self.x |= bit
+            won = WINNING[self.x]
+        else:
+            self.o |= bit
+            won = WINNING[self.o]
+
+        if won:
+            self.winner = self.current_player
+        self.play_count += 1
+        return bool(won)
+
+    #returns 'True' if last player who played has just won
+    def win_check(self):
+        return self.winner is not None
+
+    def is_over(self):
+        return self.winner is not None or (self.x | self.o) == FULL
+
+    def board_string(self):
+        return board_string(self.x, self.o)
+
+    def play(self, ask=input, show=print):
+        '''
+        Runs the game to the end with 'ask' for moves and 'show' for output
+        (input and print by default) and returns the winner's name, or None
+        for a draw.
+
+        '''
+        while not self.is_over():
+            show(self.board_string())
+            show("Play count is: {}\n".format(self.play_count))
+            move = ask("{}'s ({}) move: ".format(self.current_player, self.symbol))
+            while not self.is_valid(move):
+                show("Please enter a new number from 1 to 9: ")
+                move = ask("{}'s ({}) move: ".format(self.current_player, self.symbol))
+            self.make_move(move)
+
+        show("\n" + self.board_string())
+        if self.winner is None:
+            show("\n Draw game :)")
+        else:
+            show("\n" + "{} wins! ".format(self.winner) * 3)
+        return self.winner
+
+
+if __name__ == "__main__":
+    game = Game(input("Player 1:"), input("Player 2:"))
+    print("\nTo play, simply type the number of the cell you would like to mark.")
+    game.play()
@@ -0,0 +1,241 @@
+#Monte Carlo Tree Search player for m,n,k boards (see mnk.py)
+#
+#For boards too big to solve, each move runs a UCT search under a time or
+#rollout budget. The search is root-parallel: every worker process grows
+#its own tree from the current position with its own random seed, and
+#the visit counts of the root moves are added up across workers. The most
+#visited move is played.
+#
+#To keep the tree narrow on big boards, only empty cells within 'radius'
+#of a stone already on the board are considered.
+
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from mnk import MNKBoard, EMPTY, X, O, MARKS
+
+EXPLORATION = 1.4
+
+
+class Node():
+
+    __slots__ = ("move", "parent", "children", "untried", "visits", "wins", "mover")
+
+    #'mover' is the player who made 'move' to reach this node
+    def __init__(self, move, parent, untried, mover):
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0.0
+        self.mover = mover
+
+    def select_child(self):
+        log_visits = math.log(self.visits)
+        return max(self.children,
+                   key=lambda c: c.wins / c.visits + EXPLORATION * math.sqrt(log_visits / c.visits))
+
+
+def candidate_moves(board, radius=1):
+    '''
+    Empty cells within 'radius' of any stone, or the centre cell on an
+    empty board.
+
+    '''
+    if board.is_over():
+        return []
+    if board.moves == 0:
+        return [(board.rows // 2) * board.cols + board.cols // 2]
+
+    near = set()
+    cols = board.cols
+    for cell, mark in enumerate(board.cells):
+        if mark != EMPTY:
+            row, col = divmod(cell, cols)
+            for r in range(max(row - radius, 0), min(row + radius + 1, board.rows)):
+                for c in range(max(col - radius, 0), min(col + radius + 1, cols)):
+                    if board.cells[r * cols + c] == EMPTY:
+                        near.add(r * cols + c)
+    return list(near)
+
+
+#plays random moves to the end; returns the winner (EMPTY for a draw)
+def rollout(board, rng):
+    free = [cell for cell, mark in enumerate(board.cells) if mark == EMPTY]
+    rng.shuffle(free)
+    for cell in free:
+        if board.play(cell):
+            break
+    return board.winner
+
+
+def search(board, rollouts=None, seconds=None, seed=None, radius=1):
+    '''
+    Runs UCT from 'board' until 'rollouts' playouts or 'seconds' have been
+    used, whichever comes first. Returns ({move: visits}, rollouts done).
+
+    '''
+    if rollouts is None and seconds is None:
+        raise ValueError("Give a time budget, a rollout budget or both")
+    rng = random.Random(seed)
+    deadline = time.perf_counter() + seconds if seconds else None
+    root = Node(None, None, candidate_moves(board, radius), board.to_move)
+    rng.shuffle(root.untried)
+
+    done = 0
+    while (rollouts is None or done < rollouts) and (deadline is None or time.perf_counter() < deadline):
+        node = root
+        state = board.copy()
+
+        #selection
+        while not node.untried and node.children:
+            node = node.select_child()
+            state.play(node.move)
+
+        #expansion
+        if node.untried:
+            move = node.untried.pop()
+            mover = state.to_move
+            state.play(move)
+            untried = candidate_moves(state, radius)
+            rng.shuffle(untried)
+            child = Node(move, node, untried, mover)
+            node.children.append(child)
+            node = child
+
+        #simulation
+        winner = state.winner if state.is_over() else rollout(state, rng)
+
+        #backpropagation
+        while node is not None:
+            node.visits += 1
+            if winner == node.mover:
+                node.wins += 1.0
+            elif winner == EMPTY:
+                node.wins += 0.5
+            node = node.parent
+        done += 1
+
+    return {child.move: child.visits for child in root.children}, done
+
+
+#Internal module: runs in a worker process
+def _search_worker(job):
+    board, rollouts, seconds, seed, radius = job
+    return search(board, rollouts, seconds, seed, radius)
+
+
+def immediate_move(board, radius=1):
+    '''
+    A move that wins on the spot, else one that blocks the opponent's
+    winning move, else None.
+
+    '''
+    moves = candidate_moves(board, radius)
+    for move in moves:
+        if board.copy().play(move):
+            return move
+
+    #pretend the opponent is to move to find their winning cells
+    opponent = board.copy()
+    opponent.to_move = O if board.to_move == X else X
+    for move in moves:
+        if opponent.copy().play(move):
+            return move
+    return None
+
+
+class MCTSPlayer():
+    '''
+    Chooses moves with root-parallel MCTS on a process pool. Give it a
+    'seconds' or 'rollouts' budget per move (or both). After each move,
+    'last_stats' holds the rollouts run and rollouts/sec.
+
+        with MCTSPlayer(seconds=1.0) as player:
+            board.play(player.choose_move(board))
+
+    '''
+
+    def __init__(self, seconds=1.0, rollouts=None, workers=None, radius=1, seed=None):
+        if seconds is None and rollouts is None:
+            raise ValueError("Give a time budget, a rollout budget or both")
+        self.seconds = seconds
+        self.rollouts = rollouts
+        self.workers = workers or os.cpu_count() or 1
+        self.radius = radius
+        self.rng = random.Random(seed)
+        self.pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        self.last_stats = {}
+
+    def choose_move(self, board):
+        start = time.perf_counter()
+        move = immediate_move(board, self.radius)
+        if move is not None:
+            self.last_stats = {"rollouts": 0, "seconds": time.perf_counter() - start,
+                               "rollouts_per_sec": 0.0}
+            return move
+
+        share = None if self.rollouts is None else -(-self.rollouts // self.workers)
+        jobs = [(board, share, self.seconds, self.rng.getrandbits(64), self.radius)
+                for i in range(self.workers)]
+        if self.pool is None:
+            results = [_search_worker(job) for job in jobs]
+        else:
+            results = list(self.pool.map(_search_worker, jobs))
+
+        visits = {}
+        total = 0
+        for counts, done in results:
+            total += done
+            for move, count in counts.items():
+                visits[move] = visits.get(move, 0) + count
+
+        elapsed = time.perf_counter() - start
+        self.last_stats = {"rollouts": total, "seconds": elapsed,
+                           "rollouts_per_sec": total / elapsed if elapsed else 0.0}
+        return max(visits, key=visits.get)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+#play against MCTS: python mcts.py [rows] [cols] [k] [seconds per move]
+if __name__ == "__main__":
+    import sys
+
+    args = [int(arg) for arg in sys.argv[1:4]]
+    rows, cols, k = args + [15, 15, 5][len(args):]
+    seconds = float(sys.argv[4]) if len(sys.argv) > 4 else 2.0
+    board = MNKBoard(rows, cols, k)
+
+    with MCTSPlayer(seconds=seconds) as player:
+        while not board.is_over():
+            print("\n" + board.board_string())
+            if board.to_move == X:
+                move = input("Your (X) move: ")
+                try:
+                    board.play(int(move) - 1)
+                except ValueError:
+                    print("Please enter the number of a free cell")
+            else:
+                board.play(player.choose_move(board))
+                print("Computer played {} ({rollouts} rollouts, {rollouts_per_sec:,.0f}/sec)".format(
+                    board.last_move + 1, **player.last_stats))
+
+    print("\n" + board.board_string())
+    if board.winner == EMPTY:
+        print("\n Draw game :)")
+    else:
+        print("\n" + "{} wins! ".format(MARKS[board.winner]) * 3)
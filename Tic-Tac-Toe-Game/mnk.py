@@ -0,0 +1,139 @@
+#Generalised m,n,k game: an m x n board where k in a row wins
+#(3,3,3 is tic-tac-toe and 15,15,5 is gomoku)
+#
+#Win detection only looks at the last move. For each of the 4 line
+#directions the board keeps, at both ends of every run of same-coloured
+#stones, that run's length. A new stone joins the run ending next to it on
+#each side, so the new length and the two new ends are found with a couple
+#of array reads, no matter how big the board is.
+
+from array import array
+
+EMPTY = 0
+X = 1
+O = 2
+MARKS = {EMPTY: '.', X: 'X', O: 'O'}
+
+#(row step, column step) for rows, columns and both diagonals
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+class MNKBoard():
+
+    __slots__ = ("rows", "cols", "k", "cells", "runs", "moves", "to_move", "winner", "last_move")
+
+    def __init__(self, rows=3, cols=3, k=3):
+        if k < 1 or k > max(rows, cols):
+            raise ValueError("k must be between 1 and the longest side of the board")
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.cells = bytearray(rows * cols)
+        #runs[d][cell] is the run length in direction d, kept up to date at run ends
+        self.runs = [array('H', bytes(2 * rows * cols)) for d in DIRECTIONS]
+        self.moves = 0
+        self.to_move = X
+        self.winner = EMPTY
+        self.last_move = -1
+
+    def copy(self):
+        board = MNKBoard.__new__(MNKBoard)
+        board.rows, board.cols, board.k = self.rows, self.cols, self.k
+        board.cells = self.cells[:]
+        board.runs = [run[:] for run in self.runs]
+        board.moves = self.moves
+        board.to_move = self.to_move
+        board.winner = self.winner
+        board.last_move = self.last_move
+        return board
+
+    def is_over(self):
+        return self.winner != EMPTY or self.moves == len(self.cells)
+
+    def legal_moves(self):
+        if self.winner != EMPTY:
+            return []
+        return [cell for cell, mark in enumerate(self.cells) if mark == EMPTY]
+
+    #returns the run length from the stone next to 'cell' in direction
+    #(dr, dc) if it belongs to 'mark', else 0
+    def _neighbour_run(self, row, col, dr, dc, d, mark):
+        row += dr
+        col += dc
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            cell = row * self.cols + col
+            if self.cells[cell] == mark:
+                return self.runs[d][cell]
+        return 0
+
+    def play(self, cell):
+        '''
+        Puts the mark of the player to move on 'cell' (0 to rows*cols-1).
+        Returns True if that move won the game.
+
+        '''
+        if self.is_over():
+            raise ValueError("The game is already over")
+        if not 0 <= cell < len(self.cells) or self.cells[cell] != EMPTY:
+            raise ValueError("Cell {} is not free".format(cell))
+
+        mark = self.to_move
+        row, col = divmod(cell, self.cols)
+        self.cells[cell] = mark
+        self.moves += 1
+        self.last_move = cell
+
+        won = False
+        for d, (dr, dc) in enumerate(DIRECTIONS):
+            before = self._neighbour_run(row, col, -dr, -dc, d, mark)
+            after = self._neighbour_run(row, col, dr, dc, d, mark)
+            length = before + 1 + after
+            runs = self.runs[d]
+            #only the two ends of the joined run need the new length
+            runs[(row - before * dr) * self.cols + col - before * dc] = length
+            runs[(row + after * dr) * self.cols + col + after * dc] = length
+            if length >= self.k:
+                won = True
+
+        if won:
+            self.winner = mark
+        self.to_move = O if mark == X else X
+        return won
+
+    def board_string(self):
+        width = len(str(self.rows * self.cols))
+        lines = []
+        for row in range(self.rows):
+            marks = []
+            for col in range(self.cols):
+                cell = row * self.cols + col
+                if self.cells[cell] == EMPTY:
+                    marks.append(str(cell + 1).rjust(width))
+                else:
+                    marks.append(MARKS[self.cells[cell]].rjust(width))
+            lines.append(" ".join(marks))
+        return "\n".join(lines)
+
+
+#two players at the same computer: python mnk.py [rows] [cols] [k]
+if __name__ == "__main__":
+    import sys
+
+    args = [int(arg) for arg in sys.argv[1:4]]
+    rows, cols, k = args + [3, 3, 3][len(args):]
+    board = MNKBoard(rows, cols, k)
+    print("{} in a row wins. Type the number of the cell you would like to mark.".format(k))
+
+    while not board.is_over():
+        print("\n" + board.board_string())
+        move = input("{}'s move: ".format(MARKS[board.to_move]))
+        try:
+            board.play(int(move) - 1)
+        except ValueError:
+            print("Please enter the number of a free cell")
+
+    print("\n" + board.board_string())
+    if board.winner == EMPTY:
+        print("\n Draw game :)")
+    else:
+        print("\n" + "{} wins! ".format(MARKS[board.winner]) * 3)
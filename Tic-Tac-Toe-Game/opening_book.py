@@ -0,0 +1,125 @@
+#Perfect-play opening book for tic-tac-toe
+#
+#Every board is numbered by reading its cells as a base-3 number (0 empty,
+#1 X, 2 O, cell 1 as the lowest digit), giving 3**9 = 19683 positions. The
+#book holds one byte per position:
+#
+#    high 4 bits   game value for the player to move + 1 (0 loss, 1 draw, 2 win)
+#    low 4 bits    best cell 0-8, or NO_MOVE once the game is over
+#
+#and UNREACHABLE for boards that cannot come up in a game. The file is
+#memory-mapped the first time a position is looked up, so the AI answers
+#with one index calculation and one byte read, and nothing is solved when
+#the game starts.
+
+import mmap
+import os
+
+from bitboard import FULL, is_win, legal_moves, x_to_move, score_moves
+
+BOOK_SIZE = 3 ** 9
+NO_MOVE = 0x0F
+UNREACHABLE = 0xFF
+
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.bin")
+
+#TERNARY[mask] is the base-3 number with a 1 digit for every bit of 'mask'
+TERNARY = tuple(sum(3 ** n for n in range(9) if mask >> n & 1) for mask in range(512))
+
+
+def position_index(x, o):
+    return TERNARY[x] + 2 * TERNARY[o]
+
+
+def build_book(path=BOOK_PATH):
+    '''
+    Solves every position reachable from the empty board and writes the
+    book to 'path'. Returns the number of reachable positions.
+
+    '''
+    book = bytearray([UNREACHABLE]) * BOOK_SIZE
+    stack = [(0, 0)]
+    while stack:
+        x, o = stack.pop()
+        index = position_index(x, o)
+        if book[index] != UNREACHABLE:
+            continue
+
+        if is_win(x) or is_win(o):
+            #the player to move has just lost
+            book[index] = 0 << 4 | NO_MOVE
+            continue
+        if x | o == FULL:
+            book[index] = 1 << 4 | NO_MOVE
+            continue
+
+        scores = score_moves(x, o)
+        move = max(scores, key=scores.get)
+        value = (scores[move] > 0) - (scores[move] < 0)
+        book[index] = (value + 1) << 4 | (move - 1)
+
+        for n in legal_moves(x, o):
+            if x_to_move(x, o):
+                stack.append((x | 1 << n, o))
+            else:
+                stack.append((x, o | 1 << n))
+
+    #write then rename so a half-written book is never mapped
+    with open(path + ".tmp", "wb") as f:
+        f.write(book)
+    os.replace(path + ".tmp", path)
+    return BOOK_SIZE - book.count(UNREACHABLE)
+
+
+class OpeningBook():
+
+    __slots__ = ("path", "view")
+
+    def __init__(self, path=BOOK_PATH):
+        self.path = path
+        self.view = None
+
+    #Internal module: maps the file on first use, building it if missing
+    def _open(self):
+        if not os.path.exists(self.path):
+            build_book(self.path)
+        with open(self.path, "rb") as f:
+            view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(view) != BOOK_SIZE:
+            view.close()
+            raise ValueError("{} is not an opening book".format(self.path))
+        self.view = view
+
+    def lookup(self, x, o):
+        '''
+        Returns (best cell 1-9 or None once the game is over, game value for
+        the player to move: 1 win, 0 draw, -1 loss).
+
+        '''
+        if self.view is None:
+            self._open()
+        entry = self.view[position_index(x, o)]
+        if entry == UNREACHABLE:
+            raise ValueError("Position cannot come up in a game")
+        move = entry & 0x0F
+        return (None if move == NO_MOVE else move + 1), (entry >> 4) - 1
+
+    def best_move(self, x, o):
+        return self.lookup(x, o)[0]
+
+    def close(self):
+        if self.view is not None:
+            self.view.close()
+            self.view = None
+
+
+#python opening_book.py [path] rebuilds the book
+if __name__ == "__main__":
+    import sys
+    import time
+
+    path = sys.argv[1] if len(sys.argv) > 1 else BOOK_PATH
+    start = time.perf_counter()
+    positions = build_book(path)
+    print("Wrote {} reachable positions to {} in {:.2f} s".format(
+        positions, path, time.perf_counter() - start))
@@ -0,0 +1,213 @@
+#Batched self-play for tic-tac-toe
+#
+#Thousands of games advance one ply at a time in lockstep. The batch is
+#held as flat arrays of bitboards (see bitboard.py): xs[i] and os_[i] are
+#game i's two 9-bit masks, so a game's legal moves are one mask operation
+#and a win check is one table lookup. Each ply the policy to move is asked
+#for moves for every game still running in a single call.
+#
+#Game records are 10 bytes: the 9 cells played in order (1-9, 0 once the
+#game is over) and the result (0 draw, 1 X won, 2 O won).
+
+import mmap
+import os
+import random
+import struct
+from array import array
+
+from bitboard import WINNING, score_moves
+
+MAGIC = b"TTTS"
+VERSION = 1
+HEADER = struct.Struct("<4sHH8x")
+RECORD_SIZE = 10
+
+DRAW = 0
+X_WON = 1
+O_WON = 2
+
+#EMPTY_CELLS[mask] lists the free cells of a board whose filled cells are 'mask'
+EMPTY_CELLS = tuple(tuple(n for n in range(9) if not mask >> n & 1) for mask in range(512))
+
+
+#A policy takes the batch (xs, os_), the indexes of the games still being
+#played and a random.Random, and returns a cell 0-8 for each of those games.
+
+def random_policy(xs, os_, active, rng):
+    return [rng.choice(EMPTY_CELLS[xs[i] | os_[i]]) for i in active]
+
+
+_best_moves = {}
+
+def minimax_policy(xs, os_, active, rng):
+    '''
+    Perfect play, picking at random between equally good moves so that
+    the games in a batch are not all the same.
+
+    '''
+    moves = []
+    for i in active:
+        x, o = xs[i], os_[i]
+        key = x | o << 9
+        if key not in _best_moves:
+            scores = score_moves(x, o)
+            best = max(scores.values())
+            _best_moves[key] = tuple(cell - 1 for cell, score in scores.items() if score == best)
+        moves.append(rng.choice(_best_moves[key]))
+    return moves
+
+
+class LearnedPolicy():
+    '''
+    Plays in proportion to per-position move weights, e.g. learned from
+    game records with from_records(). Positions it has no weights for are
+    played at random.
+
+    '''
+
+    __slots__ = ("weights",)
+
+    #'weights' maps a position key (x | o << 9) to 9 weights, one per cell
+    def __init__(self, weights):
+        self.weights = weights
+
+    def __call__(self, xs, os_, active, rng):
+        moves = []
+        for i in active:
+            x, o = xs[i], os_[i]
+            free = EMPTY_CELLS[x | o]
+            weights = self.weights.get(x | o << 9)
+            if weights is None or not any(weights[n] for n in free):
+                moves.append(rng.choice(free))
+            else:
+                moves.append(rng.choices(free, [weights[n] for n in free])[0])
+        return moves
+
+    @classmethod
+    def from_records(cls, path, winners_only=True):
+        '''
+        Counts the moves played in every position of a self-play file,
+        only by the eventual winner unless winners_only is False.
+
+        '''
+        weights = {}
+        for moves, result in read_games(path):
+            x = o = 0
+            for ply, cell in enumerate(moves):
+                mover = X_WON if ply % 2 == 0 else O_WON
+                if not winners_only or result == mover:
+                    counts = weights.setdefault(x | o << 9, [0] * 9)
+                    counts[cell - 1] += 1
+                if mover == X_WON:
+                    x |= 1 << (cell - 1)
+                else:
+                    o |= 1 << (cell - 1)
+        return cls(weights)
+
+
+def play_batch(size, x_policy, o_policy, rng):
+    '''
+    Plays 'size' games in lockstep and returns (records, results) where
+    'records' holds RECORD_SIZE bytes per game.
+
+    '''
+    xs = array('H', bytes(2 * size))
+    os_ = array('H', bytes(2 * size))
+    records = bytearray(RECORD_SIZE * size)
+    active = list(range(size))
+
+    for ply in range(9):
+        if not active:
+            break
+        x_turn = ply % 2 == 0
+        moves = (x_policy if x_turn else o_policy)(xs, os_, active, rng)
+
+        still_playing = []
+        for i, cell in zip(active, moves):
+            bit = 1 << cell
+            if (xs[i] | os_[i]) & bit:
+                raise ValueError("Policy played on taken cell {}".format(cell + 1))
+            records[i * RECORD_SIZE + ply] = cell + 1
+            if x_turn:
+                xs[i] |= bit
+                won = WINNING[xs[i]]
+            else:
+                os_[i] |= bit
+                won = WINNING[os_[i]]
+
+            if won:
+                records[i * RECORD_SIZE + 9] = X_WON if x_turn else O_WON
+            elif ply < 8:
+                still_playing.append(i)
+        active = still_playing
+
+    results = records[9::RECORD_SIZE]
+    return records, results
+
+
+def self_play(games, x_policy=random_policy, o_policy=None, batch_size=10000, seed=None, path=None):
+    '''
+    Plays 'games' games in batches of 'batch_size', appending the records
+    to 'path' if given, and returns the win/draw tallies.
+
+    '''
+    o_policy = o_policy or x_policy
+    rng = random.Random(seed)
+    tally = {"games": 0, "x_wins": 0, "o_wins": 0, "draws": 0}
+
+    out = None
+    if path is not None:
+        out = open(path, "ab")
+        if out.tell() == 0:
+            out.write(HEADER.pack(MAGIC, VERSION, RECORD_SIZE))
+
+    try:
+        played = 0
+        while played < games:
+            size = min(batch_size, games - played)
+            records, results = play_batch(size, x_policy, o_policy, rng)
+            if out is not None:
+                out.write(records)
+
+            tally["games"] += size
+            tally["x_wins"] += results.count(X_WON)
+            tally["o_wins"] += results.count(O_WON)
+            tally["draws"] += results.count(DRAW)
+            played += size
+    finally:
+        if out is not None:
+            out.close()
+
+    return tally
+
+
+def read_games(path):
+    '''
+    Yields (moves, result) for every game in a self-play file, where
+    'moves' is a bytes of the cells played (1-9).
+
+    '''
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+    if len(header) != HEADER.size or HEADER.unpack(header) != (MAGIC, VERSION, RECORD_SIZE):
+        raise ValueError("{} is not a version {} self-play file".format(path, VERSION))
+    if os.path.getsize(path) == HEADER.size:
+        return
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        end = HEADER.size + (len(view) - HEADER.size) // RECORD_SIZE * RECORD_SIZE
+        for start in range(HEADER.size, end, RECORD_SIZE):
+            record = view[start:start + RECORD_SIZE]
+            yield record[:9].rstrip(b"\0"), record[9]
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for name, policy in (("random", random_policy), ("minimax", minimax_policy)):
+        start = time.perf_counter()
+        tally = self_play(games, policy, seed=0)
+        elapsed = time.perf_counter() - start
+        print("{}: {} ({:,.0f} games/sec)".format(name, tally, games / elapsed))